@@ -1,19 +1,26 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
+from app_blogs.filters import input_filter
+
 from .models import UserProfile, Avatar
 
 
 @admin.register(UserProfile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display, list_display_links = (("user", "city", "phone"),) * 2
-    list_filter = ("user", "city")
+    list_filter = (input_filter("city", _("Город"), "iexact"),)
+    list_select_related = ("user",)
+    search_fields = ("user__username",)
+    raw_id_fields = ("user",)
 
 
 @admin.register(Avatar)
 class AvatarAdmin(admin.ModelAdmin):
     list_display, list_display_links = (("avatar", "profile_view"),) * 2
-    list_filter = ("profile__user__username",)
+    list_filter = (input_filter("profile__user__username", _("Пользователь")),)
+    list_select_related = ("profile__user",)
+    autocomplete_fields = ("profile",)
 
     def profile_view(self, obj):
         return obj.profile.user.username
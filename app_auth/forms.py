@@ -4,6 +4,13 @@ from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 
 
+# адрес профиля - /<username>/, а в API - /api/<username>/, поэтому имена, совпадающие с другими адресами
+# первого уровня и с /api/articles/, заняты
+RESERVED_USERNAMES = {
+    "admin", "api", "articles", "feed", "i18n", "login", "logout", "media", "register", "search", "static",
+}
+
+
 class RegisterForm(UserCreationForm):
     phone = forms.CharField(max_length=20, required=False, label=_("Телефон"))
     city = forms.CharField(max_length=100, required=False, label=_("Город"))
@@ -12,6 +19,12 @@ class RegisterForm(UserCreationForm):
         model = User
         fields = ("username", "first_name", "last_name", "email", "phone", "city", "password1", "password2")
 
+    def clean_username(self):
+        username = self.cleaned_data["username"]
+        if username.lower() in RESERVED_USERNAMES:
+            raise forms.ValidationError(_("Это имя пользователя занято"), code="reserved")
+        return username
+
 
 class ProfileForm(forms.ModelForm):
     avatar = forms.FileField(label=_("Аватарка"), required=False, widget=forms.ClearableFileInput(attrs={"accept": "image/*"}))
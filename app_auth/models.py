@@ -19,6 +19,9 @@ class UserProfile(models.Model):
 
 class Avatar(models.Model):
     avatar = models.FileField(upload_to="files/", verbose_name=_("Аватар"))
+    thumbnail = models.FileField(upload_to="thumbnails/", blank=True, editable=False, verbose_name=_("Миниатюра"))
+    thumbnail_webp = models.FileField(upload_to="thumbnails/", blank=True, editable=False,
+                                      verbose_name=_("Миниатюра WebP"))
     profile = models.OneToOneField(UserProfile, default=None, on_delete=models.CASCADE, verbose_name=_("Пользователь"))
 
     def __str__(self):
@@ -46,6 +46,18 @@ class RegistrationTest(TestCase):
 
         return response
 
+    def test_reserved_username(self):
+        """
+        Проверка, что нельзя зарегистрироваться под именем, совпадающим с адресом другой страницы сайта
+        """
+        for username in ("search", "feed", "api", "articles", "Login"):
+            data = {"username": username, "password1": self.user_raw_password, "password2": self.user_raw_password}
+            response = self.client.post(reverse(self.tested_url_name), data)
+
+            self.assertEquals(response.status_code, 200)
+            self.assertFormError(response, "reg_form", "username", "Это имя пользователя занято")
+            self.assertFalse(get_user_model().objects.filter(username=username).exists())
+
     def test_login_and_redirect_after_registration(self):
         """
         Проверка, что после успешной регистрации происходит автоматическая авторизация и редирект на главную страницу
@@ -2,7 +2,7 @@ import os
 
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.core.files import File as DjangoFile
 
@@ -28,6 +28,13 @@ class UserProfileTest(TestCaseMixin, TestCase):
         self.assertTemplateUsed(response, self.tested_template)
         return response
 
+    def test_queries_count(self):
+        """
+        Проверка, что профиль запрашивается один раз за запрос (еще запросы - аватар и блоги)
+        """
+        with self.assertNumQueries(3):
+            self.test_page()
+
     def test_context(self):
         """
         Проверка, что на странице профиля вообще возможен вывод блогов и аватара
@@ -57,6 +64,38 @@ class UserProfileTest(TestCaseMixin, TestCase):
         response = self.test_page()
         self.assertEquals(len(response.context[self.blogs_context_name]), count)
 
+    def test_blogs_queries_count(self):
+        """
+        Проверка, что количество запросов не зависит от количества блогов
+        """
+        for i in range(0, 10):
+            Blog.objects.create(title=f"Blog {i}", profile=self.profile)
+
+        with self.assertNumQueries(3):
+            response = self.test_page()
+        self.assertContains(response, reverse("blog", args=(self.profile.user.username, Blog.objects.latest("id").id)))
+
+    @override_settings(PROFILE_BLOGS_PAGINATE_BY=3)
+    def test_blogs_pagination(self):
+        """
+        Проверка, что блоги выводятся постранично и по ссылкам "Старше" можно пройти их все
+        """
+        for i in range(0, 7):
+            Blog.objects.create(title=f"Blog {i}", profile=self.profile)
+
+        url = reverse(self.tested_url_name, args=(self.profile.user.username,))
+        seen = []
+        page = self.client.get(url).context[self.blogs_context_name]
+        while True:
+            self.assertLessEqual(len(page), 3)
+            seen.extend(blog.id for blog in page)
+            if not page.has_older:
+                break
+            page = self.client.get(url, {"older": page.older_cursor}).context[self.blogs_context_name]
+
+        self.assertEquals(seen, list(Blog.objects.order_by("-created_at", "-id").values_list("id", flat=True)))
+        self.assertEquals(self.client.get(url, {"older": "broken"}).status_code, 404)
+
     def test_no_avatar(self):
         """
         Проверка, что аватара нет на странице
@@ -208,3 +247,32 @@ class UserProfileTest(TestCaseMixin, TestCase):
         self.assertEquals(response.status_code, 302)
         self.assertEquals(response.url, reverse(self.tested_url_name, args=(self.profile.user.username,)))
         self.assertIsNotNone(Avatar.objects.filter(profile=self.profile).first())
+
+    def test_upload_not_image_avatar(self):
+        """
+        Проверка, что вместо аватара нельзя загрузить файл, не являющийся изображением
+        """
+        self.login_test()
+
+        response = self.client.post(
+            reverse(self.tested_url_name, args=(self.profile.user.username,)),
+            {"first_name": "Vladimir", "avatar": SimpleUploadedFile("me.jpg", b"not an image", content_type="image/*")}
+        )
+
+        self.assertEquals(response.status_code, 200)
+        self.assertTrue(response.context["form"].errors["avatar"])
+        self.assertIsNone(Avatar.objects.filter(profile=self.profile).first())
+
+    def test_avatar_thumbnail(self):
+        """
+        Проверка, что для загруженного аватара создается миниатюра и выводится на странице
+        """
+        self.test_upload_avatar()
+
+        avatar = Avatar.objects.get(profile=self.profile)
+        self.assertTrue(avatar.thumbnail)
+        self.assertTrue(avatar.thumbnail_webp)
+        self.assertIn(
+            r'<img src="{url}"'.format(url=avatar.thumbnail.url),
+            self.test_page().content.decode("utf-8")
+        )
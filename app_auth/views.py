@@ -1,8 +1,9 @@
+from django.conf import settings
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LoginView, LogoutView
 from django.core.exceptions import PermissionDenied
-from django.http import HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.utils.decorators import method_decorator
@@ -10,6 +11,9 @@ from django.views.generic import TemplateView, DetailView
 
 from app_blogs.models import Blog
 from app_blogs.access import has_access
+from app_blogs.pagination import InvalidCursor, KeysetPaginator
+from app_blogs.mixins import AnonymousPageCacheMixin, CachedObjectMixin, UploadLimitsMixin
+from app_blogs.thumbnails import generate_thumbnails
 
 from .forms import RegisterForm, ProfileForm
 from .models import UserProfile, Avatar
@@ -64,15 +68,17 @@ class Logout(LogoutView):
     template_name = "logout.html"
 
 
-class UserProfileDetailMixin(DetailView):
+class UserProfileDetailMixin(CachedObjectMixin, DetailView):
     model = UserProfile
+    queryset = UserProfile.objects.select_related("user")
     context_object_name = "user_profile"
     slug_field = "user__username"
     slug_url_kwarg = "username"
 
 
-class UserProfileView(UserProfileDetailMixin, DetailView):
+class UserProfileView(UploadLimitsMixin, AnonymousPageCacheMixin, UserProfileDetailMixin, DetailView):
     template_name = "user-profile.html"
+    upload_fields = ("avatar",)
 
     def init_form(self, request):
         profile = self.get_object()
@@ -89,7 +95,16 @@ class UserProfileView(UserProfileDetailMixin, DetailView):
         return Avatar.objects.filter(profile=self.get_object()).first()
 
     def ctx_blogs(self):
-        return Blog.objects.filter(profile=self.get_object()).order_by("-created_at").all()
+        """
+        Блоги выводятся постранично. Владелец блогов уже известен, а количество статей хранится в самом блоге,
+        поэтому на страницу блогов нужен один запрос
+        """
+        blogs = Blog.objects.filter(profile=self.get_object()).only("title", "created_at", "articles_counter")
+        paginator = KeysetPaginator(blogs, settings.PROFILE_BLOGS_PAGINATE_BY)
+        try:
+            return paginator.page(older=self.request.GET.get("older"), newer=self.request.GET.get("newer"))
+        except InvalidCursor as ex:
+            raise Http404(str(ex))
 
     def get(self, request, *args, **kwargs):
         response = super().get(request)
@@ -101,12 +116,12 @@ class UserProfileView(UserProfileDetailMixin, DetailView):
 
     @method_decorator(login_required)
     def post(self, request, *args, **kwargs):
-        if not has_access(request):
+        if not has_access(request, self.get_object()):
             raise PermissionDenied()
 
         form = self.init_form(request)
 
-        if form.is_valid():
+        if self.form_is_valid(form):
             form.save()
 
             profile = self.get_object()
@@ -115,12 +130,16 @@ class UserProfileView(UserProfileDetailMixin, DetailView):
             profile.save()
 
             if form.cleaned_data["avatar"]:
-                Avatar.objects.update_or_create(profile=profile, defaults={"avatar": form.cleaned_data["avatar"]})
+                avatar, created = Avatar.objects.update_or_create(profile=profile, defaults={
+                    "avatar": form.cleaned_data["avatar"], "thumbnail": "", "thumbnail_webp": "",
+                })
+                generate_thumbnails(avatar, "avatar")
 
             return HttpResponseRedirect(reverse("user_profile", args=(profile.user.username, )))
 
         ctx = dict()
+        ctx[self.context_object_name] = self.get_object()
         ctx["avatar"] = self.ctx_avatar()
         ctx["blogs"] = self.ctx_blogs()
-        ctx["form"] = self.init_form(request)
+        ctx["form"] = form
         return render(request, self.template_name, ctx)
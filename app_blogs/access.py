@@ -1,18 +1,58 @@
 from django.contrib.auth.mixins import UserPassesTestMixin
 
+from app_auth.models import UserProfile
 
-def has_access(request):
+from .models import Blog, BlogArticle, File
+
+
+def get_owner_id(obj):
+    """
+    Id пользователя, которому принадлежит объект. Связанные объекты берутся через select_related страницы
+    """
+    if isinstance(obj, UserProfile):
+        return obj.user_id
+    if isinstance(obj, Blog):
+        return obj.profile.user_id
+    if isinstance(obj, BlogArticle):
+        return obj.blog.profile.user_id
+    if isinstance(obj, File):
+        return obj.blog_article.blog.profile.user_id
+    raise TypeError(f"Unsupported object {obj!r}")
+
+
+def check_access(request, obj=None):
     if not request.user.is_authenticated:
         return False
-    
+
+    if obj is not None:
+        return get_owner_id(obj) == request.user.pk
+
     username = request.resolver_match.kwargs.get("username")
     if username:
         return request.user.username == username
     return True
 
 
+def has_access(request, obj=None):
+    """
+    Может ли пользователь изменять объект obj, а без него - страницы пользователя из адреса запроса.
+    Результат запоминается на время запроса, поэтому в шаблонах и представлениях проверку можно повторять
+    """
+    key = None if obj is None else (obj._meta.label, obj.pk)
+    cache = request.__dict__.setdefault("_access_cache", {})
+    if key not in cache:
+        cache[key] = check_access(request, obj)
+    return cache[key]
+
+
 class UserAccessMixin(UserPassesTestMixin):
+    """
+    В представлениях одного объекта проверяется, что объект принадлежит пользователю
+    """
+
     def test_func(self):
-        if hasattr(self, "request"):
-            return has_access(self.request)
-        return True
\ No newline at end of file
+        if not hasattr(self, "request"):
+            return True
+        if hasattr(self, "get_object"):
+            return has_access(self.request, self.get_object())
+        return has_access(self.request)
@@ -1,32 +1,109 @@
 from django.contrib import admin
+from django.contrib.auth import get_permission_codename
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.text import capfirst
 from django.utils.translation import gettext_lazy as _
 
-from .models import Blog, BlogArticle, File
-
-
-class BlogArticlesInline(admin.StackedInline):
-    model = BlogArticle
-    extra = 0
+from . import deletion
+from .filters import input_filter
+from .models import Blog, BlogArticle, File, ArticlesImportJob
+from .pagination import EstimatedCountPaginator
+
+
+class PerformanceModelAdmin(admin.ModelAdmin):
+    """
+    Настройки списков для больших таблиц: примерное общее количество строк и без отдельного COUNT(*) по всей таблице
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class ChunkedDeleteModelAdmin(PerformanceModelAdmin):
+    """
+    Удаление через app_blogs.deletion, а не через Collector, который загружает в память все связанные статьи
+    и файлы. Страница подтверждения тоже не перечисляет связанные объекты, а выводит их количество по счетчикам.
+    Страница удаления объекта выполняется админкой в одной транзакции, так что пачки там фиксируются вместе
+    """
+
+    def get_related_counts(self, objs):
+        """
+        Количество связанных объектов, которые удалятся вместе с objs: {модель: количество}
+        """
+        return {}
+
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs)
+        opts = self.model._meta
+        deleted_objects = [f"{capfirst(opts.verbose_name)}: {obj}" for obj in objs]
+        counts = {self.model: len(objs), **self.get_related_counts(objs)}
+        model_count = {model._meta.verbose_name_plural: count for model, count in counts.items() if count}
+        perms_needed = {
+            model._meta.verbose_name for model in counts
+            if counts[model] and not request.user.has_perm(
+                f"{model._meta.app_label}.{get_permission_codename('delete', model._meta)}"
+            )
+        }
+        return deleted_objects, model_count, perms_needed, []
 
 
 @admin.register(Blog)
-class BlogAdmin(admin.ModelAdmin):
-    readonly_fields = ("created_at", "articles_view")
+class BlogAdmin(ChunkedDeleteModelAdmin):
+    readonly_fields = ("created_at", "articles_view", "articles_link")
     list_display, list_display_links = (("title", "profile", "created_at", "articles_view"),) * 2
-    list_filter = ("profile__user__username", "created_at")
-    inlines = (BlogArticlesInline,)
+    list_filter = (input_filter("profile__user__username", _("Автор блога")), "created_at")
+    list_select_related = ("profile__user",)
+    search_fields = ("title",)
+    autocomplete_fields = ("profile",)
 
     def articles_view(self, obj):
         return obj.articles_count()
 
+    def articles_link(self, obj):
+        """
+        Вместо встроенного списка всех статей блога ссылка на постраничный список статей
+        """
+        url = reverse("admin:app_blogs_blogarticle_changelist")
+        return format_html('<a href="{}?blog__id__exact={}">{}</a>', url, obj.id, _("Перейти к статьям"))
+
+    def get_related_counts(self, blogs):
+        return {
+            BlogArticle: sum(blog.articles_counter for blog in blogs),
+            File: BlogArticle.objects.filter(blog__in=blogs).aggregate(count=Sum("files_counter"))["count"],
+        }
+
+    def delete_model(self, request, obj):
+        deletion.delete_blog(obj)
+
+    def delete_queryset(self, request, queryset):
+        for blog in queryset:
+            deletion.delete_blog(blog)
+
     articles_view.short_description = _("Кол-во записей в блоге")
+    articles_view.admin_order_field = "articles_counter"
+    articles_link.short_description = _("Статьи блога")
 
 
 @admin.register(BlogArticle)
-class BlogArticleAdmin(admin.ModelAdmin):
+class BlogArticleAdmin(ChunkedDeleteModelAdmin):
     readonly_fields = ("created_at", "edit_at", "files_view")
     list_display, list_display_links = (("title", "blog", "author_view", "content_view", "created_at", "edit_at", "files_view"),) * 2
-    list_filter = ("blog__title", "blog__profile__user__username", "created_at", "edit_at")
+    list_filter = (
+        input_filter("blog__title", _("Блог"), "icontains"),
+        input_filter("blog__profile__user__username", _("Автор блога")),
+        "created_at", "edit_at",
+    )
+    list_select_related = ("blog__profile__user",)
+    search_fields = ("title",)
+    autocomplete_fields = ("blog",)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith("_changelist"):
+            # в списке выводится только начало записи
+            queryset = queryset.defer("content")
+        return queryset
 
     def content_view(self, obj):
         return obj.short_content()
@@ -37,16 +114,33 @@ class BlogArticleAdmin(admin.ModelAdmin):
     def author_view(self, obj):
         return obj.blog.profile.user.username
 
+    def get_related_counts(self, articles):
+        return {File: sum(article.files_counter for article in articles)}
+
+    def delete_model(self, request, obj):
+        deletion.delete_blog_article(obj)
+
+    def delete_queryset(self, request, queryset):
+        deletion.delete_blog_articles(queryset)
+
     content_view.short_description = _("Содержимое записи")
     files_view.short_description = _("Кол-во файлов")
+    files_view.admin_order_field = "files_counter"
     author_view.short_description = _("Автор блога")
+    author_view.admin_order_field = "blog__profile__user__username"
 
 
 @admin.register(File)
-class FileAdmin(admin.ModelAdmin):
+class FileAdmin(PerformanceModelAdmin):
     readonly_fields = ("blog_view",)
     list_display, list_display_links = (("file", "blog_view", "author_view", "blog_article"),) * 2
-    list_filter = ("blog_article__blog__title", "blog_article__blog__profile__user__username", "blog_article__title")
+    list_filter = (
+        input_filter("blog_article__blog__title", _("Блог"), "icontains"),
+        input_filter("blog_article__blog__profile__user__username", _("Автор блога")),
+        input_filter("blog_article__title", _("Статья блога"), "icontains"),
+    )
+    list_select_related = ("blog_article__blog__profile__user",)
+    autocomplete_fields = ("blog_article",)
 
     def blog_view(self, obj):
         return obj.blog_article.blog.title
@@ -55,4 +149,15 @@ class FileAdmin(admin.ModelAdmin):
         return obj.blog_article.blog.profile.user.username
 
     blog_view.short_description = _("Блог")
+    blog_view.admin_order_field = "blog_article__blog__title"
     author_view.short_description = _("Автор блога")
+    author_view.admin_order_field = "blog_article__blog__profile__user__username"
+
+
+@admin.register(ArticlesImportJob)
+class ArticlesImportJobAdmin(admin.ModelAdmin):
+    readonly_fields = ("size", "worker", "bytes_read", "line", "imported", "failed", "errors",
+                       "created_at", "updated_at", "started_at", "finished_at")
+    list_display, list_display_links = (("id", "blog", "status", "imported", "failed", "created_at", "finished_at"),) * 2
+    list_filter = ("status", "created_at")
+    list_select_related = ("blog",)
@@ -0,0 +1,294 @@
+import os
+from collections import namedtuple
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.translation import gettext as _
+from django.views.generic import View
+
+from app_auth.models import Avatar, UserProfile
+
+from .mixins import ConditionalGetMixin
+from .models import Blog, BlogArticle, File
+from .pagination import InvalidCursor, KeysetPaginator
+
+
+ApiField = namedtuple("ApiField", ("columns", "getter"))
+
+
+def file_url(file):
+    return file.url if file else None
+
+
+def page_url(request, name, *args):
+    return request.build_absolute_uri(reverse(name, args=args))
+
+
+def get_avatar(profile):
+    try:
+        return profile.avatar
+    except Avatar.DoesNotExist:
+        return None
+
+
+class Resource:
+    """
+    Описание объекта API: поля ответа и колонки, которые для них нужны. Из базы выбираются только
+    колонки запрошенных полей, связанные объекты подтягиваются тем же запросом через select_related
+    """
+    model = None
+    select_related = ()
+    columns = ("id",)
+    fields = {}
+    # даты изменения, от которых зависит ответ с одним объектом; без них ETag меняется при любом изменении на сайте
+    last_modified_fields = ()
+
+    def parse_fields(self, value):
+        if not value:
+            return list(self.fields)
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(_("Неизвестные поля: %(fields)s") % {"fields": ", ".join(unknown)})
+        return names
+
+    def get_queryset(self, names):
+        columns = set(self.columns)
+        for name in names:
+            columns.update(self.fields[name].columns)
+        return self.model.objects.select_related(*self.select_related).only(*columns)
+
+    def serialize(self, request, obj, names):
+        return {name: self.fields[name].getter(request, obj) for name in names}
+
+
+class ProfileResource(Resource):
+    model = UserProfile
+    select_related = ("user", "avatar")
+    columns = ("id", "user__username")
+    fields = {
+        "id": ApiField((), lambda request, profile: profile.id),
+        "username": ApiField((), lambda request, profile: profile.user.username),
+        "first_name": ApiField(("user__first_name",), lambda request, profile: profile.user.first_name),
+        "last_name": ApiField(("user__last_name",), lambda request, profile: profile.user.last_name),
+        "city": ApiField(("city",), lambda request, profile: profile.city),
+        "avatar": ApiField(
+            ("avatar__avatar", "avatar__thumbnail"),
+            lambda request, profile: get_avatar(profile) and {
+                "url": file_url(profile.avatar.avatar), "thumbnail": file_url(profile.avatar.thumbnail),
+            }
+        ),
+        "url": ApiField((), lambda request, profile: page_url(request, "user_profile", profile.user.username)),
+    }
+
+
+class BlogResource(Resource):
+    model = Blog
+    select_related = ("profile__user",)
+    columns = ("id", "created_at", "profile", "profile__user__username")
+    last_modified_fields = ("edit_at",)
+    fields = {
+        "id": ApiField((), lambda request, blog: blog.id),
+        "title": ApiField(("title",), lambda request, blog: blog.title),
+        "description": ApiField(("description",), lambda request, blog: blog.description),
+        "created_at": ApiField((), lambda request, blog: blog.created_at),
+        "edit_at": ApiField(("edit_at",), lambda request, blog: blog.edit_at),
+        "articles_count": ApiField(("articles_counter",), lambda request, blog: blog.articles_counter),
+        "author": ApiField((), lambda request, blog: blog.profile.user.username),
+        "url": ApiField((), lambda request, blog: page_url(request, "blog", blog.profile.user.username, blog.id)),
+    }
+
+
+class BlogArticleResource(Resource):
+    model = BlogArticle
+    select_related = ("blog__profile__user",)
+    columns = ("id", "created_at", "blog", "blog__profile", "blog__profile__user__username")
+    last_modified_fields = ("edit_at", "blog__edit_at")
+    fields = {
+        "id": ApiField((), lambda request, article: article.id),
+        "title": ApiField(("title",), lambda request, article: article.title),
+        "excerpt": ApiField(("excerpt",), lambda request, article: article.excerpt),
+        "content": ApiField(("content",), lambda request, article: article.content),
+        "created_at": ApiField((), lambda request, article: article.created_at),
+        "edit_at": ApiField(("edit_at",), lambda request, article: article.edit_at),
+        "files_count": ApiField(("files_counter",), lambda request, article: article.files_counter),
+        "blog": ApiField(
+            ("blog__title",), lambda request, article: {"id": article.blog_id, "title": article.blog.title}
+        ),
+        "author": ApiField((), lambda request, article: article.blog.profile.user.username),
+        "url": ApiField((), lambda request, article: page_url(
+            request, "blog_article", article.blog.profile.user.username, article.blog_id, article.id
+        )),
+    }
+
+
+class FileResource(Resource):
+    model = File
+    columns = ("id", "file")
+    fields = {
+        "id": ApiField((), lambda request, file: file.id),
+        "name": ApiField((), lambda request, file: os.path.basename(file.file.name)),
+        "url": ApiField((), lambda request, file: file_url(file.file)),
+        "thumbnail": ApiField(("thumbnail",), lambda request, file: file_url(file.thumbnail)),
+        "thumbnail_webp": ApiField(("thumbnail_webp",), lambda request, file: file_url(file.thumbnail_webp)),
+    }
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiView(ConditionalGetMixin, View):
+    """
+    Ответ API в JSON. Список полей задается GET-параметром fields. ETag зависит от адреса и даты изменения
+    объекта, а где ее нет - от поколения кэша страниц, тогда клиент с актуальной копией получает 304 без обращений
+    к базе
+    """
+    resource = None
+
+    def get_data(self, names):
+        raise NotImplementedError
+
+    def not_found(self):
+        return ApiError(_("Не найдено"), status=404)
+
+    def render_json(self, data, status=200):
+        return JsonResponse(data, status=status, json_dumps_params={"ensure_ascii": False})
+
+    def get(self, request, *args, **kwargs):
+        try:
+            names = self.resource.parse_fields(request.GET.get("fields"))
+            return self.render_json(self.get_data(names))
+        except (ValueError, InvalidCursor) as ex:
+            return self.render_json({"error": str(ex)}, status=400)
+        except ApiError as ex:
+            return self.render_json({"error": str(ex)}, status=ex.status)
+
+
+class ApiDetailView(ApiView):
+    def filter_queryset(self, queryset):
+        raise NotImplementedError
+
+    def get_last_modified(self):
+        fields = self.resource.last_modified_fields
+        if not fields:
+            return None
+        timestamps = self.filter_queryset(self.resource.model.objects.all()).values_list(*fields).first()
+        return max(timestamps) if timestamps else None
+
+    def get_data(self, names):
+        obj = self.filter_queryset(self.resource.get_queryset(names)).first()
+        if obj is None:
+            raise self.not_found()
+        return self.resource.serialize(self.request, obj, names)
+
+
+class ApiListView(ApiView):
+    """
+    Список с курсорной пагинацией: ссылки на соседние страницы передаются в next и previous.
+    Даты изменения списка пришлось бы собирать по всем его объектам (и она не меняется при удалениях),
+    поэтому ETag списков остается на поколении кэша страниц
+    """
+
+    def filter_queryset(self, queryset):
+        return queryset
+
+    def parent_exists(self):
+        return True
+
+    def page_link(self, name, cursor):
+        if cursor is None:
+            return None
+        params = self.request.GET.copy()
+        params.pop("older", None)
+        params.pop("newer", None)
+        params[name] = cursor
+        return self.request.build_absolute_uri(f"{self.request.path}?{params.urlencode()}")
+
+    def get_data(self, names):
+        queryset = self.filter_queryset(self.resource.get_queryset(names))
+        paginator = KeysetPaginator(queryset, settings.API_PAGINATE_BY)
+        page = paginator.page(older=self.request.GET.get("older"), newer=self.request.GET.get("newer"))
+        # владелец списка проверяется отдельным запросом, только если страница пуста
+        if not page.object_list and not self.parent_exists():
+            raise self.not_found()
+        return {
+            "results": [self.resource.serialize(self.request, obj, names) for obj in page],
+            "next": self.page_link("older", page.older_cursor),
+            "previous": self.page_link("newer", page.newer_cursor),
+        }
+
+
+class ArticlesApiView(ApiListView):
+    resource = BlogArticleResource()
+
+
+class UserProfileApiView(ApiDetailView):
+    resource = ProfileResource()
+
+    def filter_queryset(self, queryset):
+        return queryset.filter(user__username=self.kwargs["username"])
+
+
+class UserProfileBlogsApiView(ApiListView):
+    resource = BlogResource()
+
+    def filter_queryset(self, queryset):
+        return queryset.filter(profile__user__username=self.kwargs["username"])
+
+    def parent_exists(self):
+        return UserProfile.objects.filter(user__username=self.kwargs["username"]).exists()
+
+
+class BlogApiView(ApiDetailView):
+    resource = BlogResource()
+
+    def filter_queryset(self, queryset):
+        return queryset.filter(id=self.kwargs["pk"], profile__user__username=self.kwargs["username"])
+
+
+class BlogArticlesApiView(ApiListView):
+    resource = BlogArticleResource()
+
+    def filter_queryset(self, queryset):
+        return queryset.filter(blog_id=self.kwargs["pk"], blog__profile__user__username=self.kwargs["username"])
+
+    def parent_exists(self):
+        return Blog.objects.filter(id=self.kwargs["pk"], profile__user__username=self.kwargs["username"]).exists()
+
+
+class BlogArticleApiView(ApiDetailView):
+    resource = BlogArticleResource()
+
+    def filter_queryset(self, queryset):
+        return queryset.filter(
+            id=self.kwargs["pk"], blog_id=self.kwargs["blogid"], blog__profile__user__username=self.kwargs["username"]
+        )
+
+
+class BlogArticleFilesApiView(ApiView):
+    """
+    Вложения статьи выводятся одним списком без пагинации
+    """
+    resource = FileResource()
+
+    def get_last_modified(self):
+        # добавление и удаление вложений сдвигает дату изменения статьи
+        return BlogArticle.objects.filter(
+            id=self.kwargs["pk"], blog_id=self.kwargs["blogid"],
+            blog__profile__user__username=self.kwargs["username"]
+        ).values_list("edit_at", flat=True).first()
+
+    def get_data(self, names):
+        pk, blogid, username = self.kwargs["pk"], self.kwargs["blogid"], self.kwargs["username"]
+        files = self.resource.get_queryset(names).filter(
+            blog_article_id=pk, blog_article__blog_id=blogid, blog_article__blog__profile__user__username=username
+        ).order_by("id")
+        results = [self.resource.serialize(self.request, file, names) for file in files]
+        article = BlogArticle.objects.filter(id=pk, blog_id=blogid, blog__profile__user__username=username)
+        if not results and not article.exists():
+            raise self.not_found()
+        return {"results": results}
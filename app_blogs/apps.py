@@ -1,7 +1,23 @@
 from django.apps import AppConfig
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_migrate
 from django.utils.translation import gettext_lazy as _
 
 
 class AppBlogsConfig(AppConfig):
     name = 'app_blogs'
     verbose_name = _("Блоги")
+
+    def ready(self):
+        from . import db, signals
+
+        post_migrate.connect(setup_search_index, sender=self)
+
+
+def setup_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Поисковый индекс не является моделью, поэтому создается после миграций
+    """
+    if using == DEFAULT_DB_ALIAS:
+        from .search import create_search_index
+        create_search_index()
@@ -0,0 +1,222 @@
+import math
+import random
+import time
+import tracemalloc
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app_auth.models import Avatar, UserProfile
+
+from .cache import invalidate_pages
+from .importing import import_rows, iter_lines, iter_rows
+from .models import Blog, BlogArticle, File
+from .search import rebuild_search_index
+
+
+WORDS = (
+    "блог статья заметка путешествие город море горы поход книга фильм музыка кухня рецепт спорт бег "
+    "утро вечер погода работа проект код база данных запрос страница сервер кэш индекс очередь"
+).split()
+
+PERCENTILES = (50, 90, 95, 99)
+
+Scenario = namedtuple("Scenario", ("name", "run"))
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def make_text(rnd, words):
+    return " ".join(rnd.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def generate_data(users, blogs, articles, files, prefix="bench", seed=0, batch_size=1000):
+    """
+    Заполняет базу пользователями с профилями и аватарами, блогами (blogs на пользователя), статьями (articles
+    на блог) и записями о вложениях (files на статью, сами файлы не создаются). Объекты создаются через
+    bulk_create, счетчики заполняются сразу, поисковый индекс перестраивается в конце. С одинаковым seed
+    получаются одинаковые данные
+    """
+    rnd = random.Random(seed)
+    User = get_user_model()
+
+    User.objects.bulk_create(
+        (User(username=f"{prefix}{i}", password=make_password(None)) for i in range(users)), batch_size=batch_size
+    )
+    user_ids = list(User.objects.filter(username__startswith=prefix).order_by("id").values_list("id", flat=True))
+    UserProfile.objects.bulk_create(
+        (UserProfile(user_id=user_id, city=rnd.choice(WORDS)) for user_id in user_ids), batch_size=batch_size
+    )
+    profile_ids = list(UserProfile.objects.filter(user_id__in=user_ids).order_by("id").values_list("id", flat=True))
+    Avatar.objects.bulk_create(
+        (Avatar(avatar=f"files/{prefix}-avatar-{profile_id}.jpg", profile_id=profile_id) for profile_id in profile_ids),
+        batch_size=batch_size
+    )
+
+    Blog.objects.bulk_create(
+        (
+            Blog(title=make_text(rnd, 3), description=make_text(rnd, 20), profile_id=profile_id,
+                 articles_counter=articles)
+            for profile_id in profile_ids for _ in range(blogs)
+        ),
+        batch_size=batch_size
+    )
+    blog_ids = Blog.objects.filter(profile_id__in=profile_ids).order_by("id").values_list("id", flat=True)
+
+    def new_articles():
+        for blog_id in blog_ids.iterator():
+            for _ in range(articles):
+                content = make_text(rnd, rnd.randint(50, 400))
+                yield BlogArticle(title=make_text(rnd, 5), content=content, excerpt=BlogArticle.make_excerpt(content),
+                                  blog_id=blog_id, files_counter=files)
+
+    bulk_create_all(BlogArticle, new_articles(), batch_size)
+
+    article_ids = BlogArticle.objects.filter(blog__profile_id__in=profile_ids).order_by("id").values_list("id", flat=True)
+    bulk_create_all(File, (
+        File(file=f"files/{prefix}-{article_id}-{i}.jpg", blog_article_id=article_id)
+        for article_id in article_ids.iterator() for i in range(files)
+    ), batch_size)
+
+    rebuild_search_index()
+    invalidate_pages()
+
+
+def bulk_create_all(model, objects, batch_size):
+    """
+    bulk_create для генератора: объекты создаются пачками, не собирая их все в памяти
+    """
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    position = (len(values) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def page_scenario(name, client, url):
+    def run():
+        response = client.get(url)
+        if response.status_code != 200:
+            raise BenchmarkError(f"{name}: {url} вернул {response.status_code}")
+    return Scenario(name, run)
+
+
+def import_scenario(blog, rows):
+    data = "".join(f"Статья {i};{make_text(random.Random(i), 100)}\r\n" for i in range(rows)).encode("utf-8")
+
+    def run():
+        import_rows(blog, iter_rows(iter_lines([data], "utf-8")))
+    return Scenario("csv_import", run)
+
+
+def get_scenarios(prefix="bench", import_rows_count=500):
+    """
+    Главные страницы сайта и админки на сгенерированных данных. Страницы открывает авторизованный читатель,
+    чтобы измерялась сборка страницы, а не кэш для анонимов; главная для анонима измеряется отдельно
+    """
+    User = get_user_model()
+    blog = Blog.objects.filter(profile__user__username__startswith=prefix).select_related("profile__user") \
+        .order_by("id").first()
+    if blog is None:
+        raise BenchmarkError("Нет данных для замеров, сначала нужно их сгенерировать")
+    article = BlogArticle.objects.filter(blog=blog).order_by("-created_at", "-id").first()
+    username = blog.profile.user.username
+
+    reader, _ = User.objects.get_or_create(username=f"{prefix}-reader")
+    admin, _ = User.objects.get_or_create(username=f"{prefix}-admin", defaults={
+        "is_staff": True, "is_superuser": True,
+    })
+    reader_client, admin_client = Client(), Client()
+    reader_client.force_login(reader)
+    admin_client.force_login(admin)
+
+    import_blog, _ = Blog.objects.get_or_create(title=f"{prefix}-import", profile=blog.profile)
+
+    return [
+        page_scenario("home", reader_client, reverse("home")),
+        page_scenario("home_anonymous", Client(), reverse("home")),
+        page_scenario("blog", reader_client, reverse("blog", args=(username, blog.id))),
+        page_scenario("blog_article", reader_client, reverse("blog_article", args=(username, blog.id, article.id))),
+        page_scenario("user_profile", reader_client, reverse("user_profile", args=(username,))),
+        page_scenario("admin_blogs", admin_client, reverse("admin:app_blogs_blog_changelist")),
+        page_scenario("admin_articles", admin_client, reverse("admin:app_blogs_blogarticle_changelist")),
+        page_scenario("admin_files", admin_client, reverse("admin:app_blogs_file_changelist")),
+        page_scenario("admin_profiles", admin_client, reverse("admin:app_auth_userprofile_changelist")),
+        import_scenario(import_blog, import_rows_count),
+    ]
+
+
+def measure(scenario, repeat, warmup):
+    """
+    Время считается по отдельным прогонам без посторонних замеров. Количество запросов к базе и пиковая
+    память (tracemalloc замедляет код) снимаются еще двумя прогонами после них
+    """
+    for _ in range(warmup):
+        scenario.run()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        scenario.run()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # при DEBUG журнал запросов мог заполниться до предела, и CaptureQueriesContext ничего бы не увидел
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        scenario.run()
+    # captured_queries читает журнал соединения, который следующий запрос очистит
+    query_count = len(queries.captured_queries)
+
+    tracemalloc.start()
+    try:
+        scenario.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    result = {f"p{percent}_ms": round(percentile(timings, percent), 3) for percent in PERCENTILES}
+    result.update(
+        min_ms=round(min(timings), 3), max_ms=round(max(timings), 3),
+        mean_ms=round(sum(timings) / len(timings), 3),
+        queries=query_count, peak_memory_kb=round(peak / 1024, 1), runs=repeat,
+    )
+    return result
+
+
+def run_benchmarks(scenarios, repeat=20, warmup=2, names=None):
+    return {
+        scenario.name: measure(scenario, repeat, warmup)
+        for scenario in scenarios if not names or scenario.name in names
+    }
+
+
+def compare_results(previous, current):
+    """
+    Сравнение с прошлым прогоном: медиана времени и количество запросов по каждому сценарию
+    """
+    rows = []
+    for name, result in current.items():
+        before = previous.get(name)
+        if before is None:
+            continue
+        change = (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0.0
+        rows.append((name, before["p50_ms"], result["p50_ms"], change, before["queries"], result["queries"]))
+    return rows
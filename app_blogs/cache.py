@@ -0,0 +1,103 @@
+import hashlib
+import re
+import uuid
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from django.utils.translation import get_language
+
+
+GENERATION_KEY = "pages:generation"
+FRAGMENTS_VERSION_KEY = "fragments:version"
+
+CSRF_PLACEHOLDER = b"__csrf_token__"
+CSRF_TOKEN_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def get_page_cache():
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def get_generation():
+    """
+    Поколение кэша входит в ключ каждой страницы, поэтому смена поколения сбрасывает весь кэш страниц разом
+    """
+    cache = get_page_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate_pages():
+    get_page_cache().set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def get_fragments_version():
+    """
+    Версия входит в ключи кэша фрагментов статей вместе с edit_at. Ее меняют те, кто изменяет статьи через update(),
+    не трогая дату изменения
+    """
+    cache = get_page_cache()
+    version = cache.get(FRAGMENTS_VERSION_KEY)
+    if version is None:
+        cache.add(FRAGMENTS_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(FRAGMENTS_VERSION_KEY)
+    return version
+
+
+def invalidate_fragments():
+    get_page_cache().set(FRAGMENTS_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def page_cache_key(request):
+    url = hashlib.md5(request.build_absolute_uri().encode("utf-8")).hexdigest()
+    return f"pages:{get_generation()}:{get_language()}:{url}"
+
+
+def is_page_cacheable(request):
+    """
+    Кэшируются только страницы для анонимных пользователей: авторизованным выводится меню профиля
+    и ссылки редактирования. Страницы с непоказанными сообщениями тоже не кэшируются
+    """
+    return (
+        request.method in ("GET", "HEAD")
+        and not request.user.is_authenticated
+        and not len(get_messages(request))
+    )
+
+
+def get_cached_page(request, key):
+    cached = get_page_cache().get(key)
+    if cached is None:
+        return None
+
+    content, content_type, etag, last_modified = cached
+    response = HttpResponse(content.replace(CSRF_PLACEHOLDER, get_token(request).encode()), content_type=content_type)
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = last_modified
+    return get_conditional_response(
+        request, etag=etag, last_modified=parse_http_date_safe(last_modified or ""), response=response
+    )
+
+
+def cache_page_response(key, response):
+    """
+    CSRF-токен у каждого посетителя свой, поэтому в кэш страница попадает с заглушкой вместо токена
+    """
+    if response.status_code != 200 or response.streaming:
+        return
+    content = CSRF_TOKEN_RE.sub(rb"\g<1>" + CSRF_PLACEHOLDER + rb"\g<2>", response.content)
+    get_page_cache().set(
+        key,
+        (content, response["Content-Type"], response.get("ETag"), response.get("Last-Modified")),
+        settings.PAGE_CACHE_TIMEOUT
+    )
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Применяет SQLITE_PRAGMAS к каждому новому соединению с SQLite
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(request_started)
+def check_connections(sender, **kwargs):
+    """
+    Закрывает постоянные соединения, которые перестали работать (например, после перезапуска сервера БД),
+    чтобы запрос открыл новое. В Django 2.2 нет CONN_HEALTH_CHECKS, поэтому проверка сделана здесь
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if connection.connection is not None and connection.settings_dict["CONN_MAX_AGE"] \
+                and not connection.in_atomic_block and not connection.is_usable():
+            connection.close()
@@ -0,0 +1,169 @@
+import os
+import posixpath
+import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from app_auth.models import Avatar
+
+from .cache import invalidate_pages
+from .models import ArticlesImportJob, Blog, BlogArticle, File, PendingMediaDeletion
+from .search import remove_articles
+from .signals import update_articles_counter
+
+
+def raw_delete(queryset):
+    """
+    DELETE одним запросом: без загрузки объектов в память и без сигналов, в отличие от QuerySet.delete()
+    """
+    # у QuerySet нет публичного способа удалить строки без Collector: на статьях и файлах висят сигналы
+    # post_delete и каскады, поэтому delete() сначала выбирает все объекты. _raw_delete - приватный метод,
+    # при обновлении Django его нужно проверять, зато счетчики, индекс и файлы здесь обновляются явно
+    return queryset._raw_delete(queryset.db)
+
+
+def schedule_media_deletion(names):
+    PendingMediaDeletion.objects.bulk_create(PendingMediaDeletion(name=name) for name in names if name)
+
+
+def delete_articles_chunk(blog_id, article_ids):
+    """
+    Удаляет статьи вместе с файлами. Файлы в хранилище ставятся в очередь на удаление
+    """
+    with transaction.atomic():
+        files = File.objects.filter(blog_article_id__in=article_ids)
+        schedule_media_deletion(
+            name for names in files.values_list("file", "thumbnail", "thumbnail_webp") for name in names
+        )
+        raw_delete(files)
+        remove_articles(article_ids)
+        deleted = raw_delete(BlogArticle.objects.filter(id__in=article_ids))
+        update_articles_counter(blog_id, -deleted)
+    return deleted
+
+
+def delete_articles(blog_id, articles):
+    """
+    Удаляет статьи пачками по BLOG_DELETE_BATCH_SIZE, каждая пачка в своей транзакции
+    """
+    batch_size = settings.BLOG_DELETE_BATCH_SIZE
+    deleted = 0
+    while True:
+        article_ids = list(articles.order_by("id").values_list("id", flat=True)[:batch_size])
+        if not article_ids:
+            return deleted
+        deleted += delete_articles_chunk(blog_id, article_ids)
+
+
+def delete_blog(blog):
+    deleted = delete_articles(blog.id, BlogArticle.objects.filter(blog=blog))
+
+    with transaction.atomic():
+        jobs = ArticlesImportJob.objects.filter(blog=blog)
+        schedule_media_deletion(jobs.values_list("file", flat=True))
+        raw_delete(jobs)
+        raw_delete(Blog.objects.filter(id=blog.id))
+
+    transaction.on_commit(invalidate_pages)
+    return deleted
+
+
+def delete_blog_article(article):
+    deleted = delete_articles_chunk(article.blog_id, [article.id])
+    transaction.on_commit(invalidate_pages)
+    return deleted
+
+
+def delete_blog_articles(articles):
+    """
+    Удаляет выборку статей из разных блогов: пачками, отдельно по каждому блогу
+    """
+    deleted = 0
+    for blog_id in articles.order_by().values_list("blog_id", flat=True).distinct():
+        deleted += delete_articles(blog_id, articles.filter(blog_id=blog_id))
+    transaction.on_commit(invalidate_pages)
+    return deleted
+
+
+MEDIA_REFERENCES = (
+    (File, ("file", "thumbnail", "thumbnail_webp")),
+    (Avatar, ("avatar", "thumbnail", "thumbnail_webp")),
+    (ArticlesImportJob, ("file",)),
+)
+
+
+def media_directories():
+    """
+    Каталоги хранилища, в которые загружают файлы модели из MEDIA_REFERENCES
+    """
+    return sorted({
+        model._meta.get_field(field).upload_to.rstrip("/") for model, fields in MEDIA_REFERENCES for field in fields
+    })
+
+
+def iter_stored_files(directory, storage=default_storage):
+    """
+    Файлы каталога хранилища: имя, размер и время изменения. На файловой системе каталоги читаются
+    через os.scandir по мере обхода, не загружая в память список всех файлов
+    """
+    try:
+        root = storage.path(directory)
+    except NotImplementedError:
+        subdirectories, names = storage.listdir(directory)
+        for name in names:
+            name = posixpath.join(directory, name)
+            yield name, storage.size(name), storage.get_modified_time(name).timestamp()
+        for subdirectory in subdirectories:
+            yield from iter_stored_files(posixpath.join(directory, subdirectory), storage)
+        return
+
+    if not os.path.isdir(root):
+        return
+    with os.scandir(root) as entries:
+        for entry in entries:
+            name = posixpath.join(directory, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_stored_files(name, storage)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                yield name, stat.st_size, stat.st_mtime
+
+
+def referenced_names(names):
+    """
+    Какие из имен файлов упоминаются в базе, в том числе уже стоят в очереди на удаление
+    """
+    referenced = set(PendingMediaDeletion.objects.filter(name__in=names).values_list("name", flat=True))
+    for model, fields in MEDIA_REFERENCES:
+        for field in fields:
+            referenced.update(model.objects.filter(**{f"{field}__in": names}).values_list(field, flat=True))
+    return referenced
+
+
+def find_orphaned_media(min_age, batch_size, storage=default_storage):
+    """
+    Файлы хранилища старше min_age секунд, на которые не ссылается ни одна запись. Список файлов
+    проверяется по базе пачками по batch_size, поэтому память не зависит от количества файлов
+    """
+    modified_before = time.time() - min_age
+    for directory in media_directories():
+        batch = {}
+        for name, size, modified_at in iter_stored_files(directory, storage):
+            if modified_at > modified_before:
+                continue
+            batch[name] = size
+            if len(batch) >= batch_size:
+                yield from orphans_in_batch(batch)
+                batch = {}
+        yield from orphans_in_batch(batch)
+
+
+def orphans_in_batch(batch):
+    if not batch:
+        return
+    referenced = referenced_names(list(batch))
+    for name, size in batch.items():
+        if name not in referenced:
+            yield name, size
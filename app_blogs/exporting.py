@@ -0,0 +1,61 @@
+import csv
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .importing import ArticlesDialect
+
+
+class Echo:
+    """
+    "Файл" для csv.writer, который не копит записанное, а сразу возвращает строку
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(articles):
+    """
+    Статьи в том же формате CSV, который принимает импорт: title;content без строки заголовка
+    """
+    writer = csv.writer(Echo(), ArticlesDialect)
+    for article in articles:
+        yield writer.writerow((article.title, article.content)).encode("utf-8")
+
+
+def iter_jsonl(articles):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for article in articles:
+        line = encoder.encode({
+            "id": article.id, "blog": article.blog_id, "title": article.title, "content": article.content,
+            "created_at": article.created_at, "edit_at": article.edit_at,
+        })
+        yield (line + "\n").encode("utf-8")
+
+
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+    "jsonl": (iter_jsonl, "application/x-ndjson; charset=utf-8"),
+}
+
+
+def iter_export(articles, export_format):
+    """
+    Статьи в формате export_format. Выборка читается из базы порциями по BLOG_ARTICLES_EXPORT_CHUNK_SIZE
+    (на PostgreSQL - серверным курсором), поэтому список статей целиком в памяти не собирается
+    """
+    serialize = EXPORT_FORMATS[export_format][0]
+    articles = articles.only("id", "blog_id", "title", "content", "created_at", "edit_at").order_by("created_at", "id")
+    return serialize(articles.iterator(chunk_size=settings.BLOG_ARTICLES_EXPORT_CHUNK_SIZE))
+
+
+def export_articles(articles, export_format, filename):
+    """
+    Отдает статьи потоком, ответ целиком тоже не собирается
+    """
+    content_type = EXPORT_FORMATS[export_format][1]
+    response = StreamingHttpResponse(iter_export(articles, export_format), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,127 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import parse_http_date_safe, quote_etag
+from django.utils.translation import gettext as _
+
+from app_auth.models import UserProfile
+
+from .cache import get_page_cache, page_cache_key
+from .models import Blog, BlogArticle
+
+
+class CachedFeed(Feed):
+    """
+    Лента статей, которая хранится в кэше страниц целиком вместе с ETag и Last-Modified. Ключ включает
+    поколение кэша, поэтому лента собирается заново после изменения или удаления статей. Клиент,
+    который уже получал ленту, получает 304 без запросов к базе
+    """
+
+    def __call__(self, request, *args, **kwargs):
+        cache, key = get_page_cache(), page_cache_key(request)
+        cached = cache.get(key)
+        if cached is None:
+            response = super().__call__(request, *args, **kwargs)
+            etag = quote_etag(hashlib.md5(response.content).hexdigest())
+            cached = (response.content, response["Content-Type"], etag, response.get("Last-Modified"))
+            cache.set(key, cached, settings.FEED_CACHE_TIMEOUT)
+
+        content, content_type, etag, last_modified = cached
+        response = HttpResponse(content, content_type=content_type)
+        response["ETag"] = etag
+        if last_modified:
+            response["Last-Modified"] = last_modified
+        return get_conditional_response(
+            request, etag=etag, last_modified=parse_http_date_safe(last_modified or ""), response=response
+        )
+
+    def get_articles(self, obj):
+        return BlogArticle.objects.listing()
+
+    def items(self, obj):
+        # последние статьи выбираются по индексу (created_at, id), текст статей не загружается
+        return self.get_articles(obj).order_by("-created_at", "-id")[:settings.FEED_ARTICLES_COUNT]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.short_content()
+
+    def item_link(self, item):
+        return reverse("blog_article", args=(item.blog.profile.user.username, item.blog_id, item.id))
+
+    def item_author_name(self, item):
+        return item.blog.profile.user.username
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.edit_at
+
+
+class LatestArticlesFeed(CachedFeed):
+    def title(self):
+        return _("Новые статьи")
+
+    def description(self):
+        return _("Последние статьи всех блогов")
+
+    def link(self):
+        return reverse("home")
+
+
+class UserProfileArticlesFeed(CachedFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(UserProfile.objects.select_related("user"), user__username=username)
+
+    def get_articles(self, profile):
+        return super().get_articles(profile).filter(blog__profile=profile)
+
+    def title(self, profile):
+        return _("Статьи пользователя %(username)s") % {"username": profile.user.username}
+
+    def description(self, profile):
+        return self.title(profile)
+
+    def link(self, profile):
+        return reverse("user_profile", args=(profile.user.username,))
+
+
+class BlogArticlesFeed(CachedFeed):
+    def get_object(self, request, username, pk):
+        return get_object_or_404(Blog.objects.select_related("profile__user"), id=pk, profile__user__username=username)
+
+    def get_articles(self, blog):
+        return super().get_articles(blog).filter(blog=blog)
+
+    def title(self, blog):
+        return blog.title
+
+    def description(self, blog):
+        return blog.description
+
+    def link(self, blog):
+        return reverse("blog", args=(blog.profile.user.username, blog.id))
+
+
+class LatestArticlesAtomFeed(LatestArticlesFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestArticlesFeed.description
+
+
+class UserProfileArticlesAtomFeed(UserProfileArticlesFeed):
+    feed_type = Atom1Feed
+    subtitle = UserProfileArticlesFeed.description
+
+
+class BlogArticlesAtomFeed(BlogArticlesFeed):
+    feed_type = Atom1Feed
+    subtitle = BlogArticlesFeed.description
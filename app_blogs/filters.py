@@ -0,0 +1,38 @@
+from django.contrib import admin
+from django.contrib.admin.views.main import PAGE_VAR
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    Фильтр списка в админке с полем ввода. В отличие от стандартных фильтров по полям
+    не выбирает из базы все различные значения, чтобы показать их списком
+    """
+    template = "admin/input_filter.html"
+    lookup = "exact"
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+        if value:
+            return queryset.filter(**{f"{self.parameter_name}__{self.lookup}": value})
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "params": [(key, value) for key, value in changelist.params.items()
+                       if key not in (self.parameter_name, PAGE_VAR)],
+        }
+
+
+def input_filter(field, title, lookup="exact"):
+    """
+    Создает фильтр с полем ввода по полю field (например blog__title) с условием lookup
+    """
+    return type("InputFilter", (InputFilter,), {"parameter_name": field, "lookup": lookup, "title": title})
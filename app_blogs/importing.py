@@ -0,0 +1,166 @@
+import codecs
+import csv
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils.translation import gettext as _
+
+from .cache import invalidate_pages
+from .models import BlogArticle
+from .search import index_blog
+from .signals import update_articles_counter
+
+
+ENCODINGS = ("utf-8-sig", "windows-1251")
+
+MAX_REPORTED_ERRORS = 100
+
+
+class ArticlesDialect(csv.Dialect):
+    """
+    Формат CSV со статьями: две колонки title;content, значения с переносами строк и ; в кавычках
+    """
+    delimiter = ";"
+    quotechar = '"'
+    doublequote = True
+    skipinitialspace = False
+    lineterminator = "\r\n"
+    quoting = csv.QUOTE_MINIMAL
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.line = 0
+
+    def add_error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def iter_lines(chunks, encoding):
+    """
+    Построчно декодирует поток байтов, не собирая весь файл в памяти
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    tail = ""
+    for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_rows(lines):
+    """
+    Разбирает строки CSV, возвращая номер первой строки записи и саму запись или ошибку разбора
+    """
+    csv.field_size_limit(max(csv.field_size_limit(), settings.BLOG_ARTICLES_IMPORT_MAX_FIELD_SIZE))
+
+    csv_reader = csv.reader(lines, ArticlesDialect)
+    line = 1
+    while True:
+        try:
+            row = next(csv_reader)
+        except StopIteration:
+            return
+        except csv.Error as ex:
+            yield line, None, str(ex)
+        else:
+            if row:
+                yield line, row, None
+        line = csv_reader.line_num + 1
+
+
+def parse_row(row):
+    """
+    Проверяет запись CSV и возвращает заголовок и содержимое статьи
+    """
+    if len(row) < 2:
+        raise ValueError(_("Ожидается две колонки: заголовок и содержимое статьи"))
+
+    title, content = row[0].strip(), row[1]
+    max_length = BlogArticle._meta.get_field("title").max_length
+    if not title:
+        raise ValueError(_("Не указан заголовок статьи"))
+    if len(title) > max_length:
+        raise ValueError(_("Заголовок статьи длиннее %(max_length)d символов") % {"max_length": max_length})
+    return title, content
+
+
+def save_articles(blog, articles):
+    """
+    bulk_create не вызывает сигналов, поэтому счетчик статей и поисковый индекс обновляются здесь.
+    На SQLite bulk_create не возвращает id, поэтому в индекс добавляются статьи блога после последней существующей
+    """
+    with transaction.atomic():
+        last_id = BlogArticle.objects.filter(blog=blog).aggregate(last=Max("id"))["last"]
+        BlogArticle.objects.bulk_create(articles)
+        index_blog(blog.id, after_id=last_id or 0)
+        # счетчик обновляется последним: строка блога блокируется до конца транзакции, и параллельные
+        # загрузки в тот же блог ждут друг друга только на этом шаге и фиксации
+        update_articles_counter(blog.id, len(articles))
+        transaction.on_commit(invalidate_pages)
+
+
+def import_rows(blog, rows, batch_size=None, on_progress=None):
+    """
+    Сохраняет статьи пачками. Каждая пачка сохраняется в одной транзакции с вызовом on_progress,
+    поэтому сохраненный в нем прогресс всегда соответствует сохраненным статьям
+    """
+    batch_size = batch_size or settings.BLOG_ARTICLES_IMPORT_BATCH_SIZE
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            if batch:
+                save_articles(blog, batch)
+                result.imported += len(batch)
+            if on_progress is not None:
+                on_progress(result)
+        batch.clear()
+
+    for line, row, error in rows:
+        if error is None:
+            try:
+                title, content = parse_row(row)
+            except ValueError as ex:
+                error = str(ex)
+            else:
+                batch.append(BlogArticle(title=title, content=content, excerpt=BlogArticle.make_excerpt(content), blog=blog))
+
+        if error is not None:
+            result.add_error(line, error)
+
+        result.line = line
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+    return result
+
+
+def detect_encoding(file):
+    """
+    Подбирает кодировку, в которой файл декодируется целиком, не загружая его в память
+    """
+    for encoding in ENCODINGS:
+        file.seek(0)
+        try:
+            for line in iter_lines(file.chunks(), encoding):
+                pass
+        except UnicodeDecodeError:
+            if encoding == ENCODINGS[-1]:
+                raise
+        else:
+            file.seek(0)
+            return encoding
+
@@ -0,0 +1,112 @@
+import json
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from .importing import MAX_REPORTED_ERRORS, detect_encoding, import_rows, iter_lines, iter_rows
+from .models import ArticlesImportJob
+
+
+logger = logging.getLogger(__name__)
+
+
+class JobLost(Exception):
+    """
+    Задачу забрал другой обработчик (или она удалена вместе с блогом), продолжать ее нельзя
+    """
+
+
+def enqueue_import(blog, file):
+    return ArticlesImportJob.objects.create(blog=blog, file=file, size=file.size)
+
+
+def claimable_jobs(stale_timeout=None):
+    condition = Q(status=ArticlesImportJob.STATUS_PENDING)
+    if stale_timeout:
+        condition |= Q(
+            status=ArticlesImportJob.STATUS_RUNNING,
+            updated_at__lt=timezone.now() - timedelta(seconds=stale_timeout)
+        )
+    return ArticlesImportJob.objects.filter(condition)
+
+
+def claim_job(worker, stale_timeout=None):
+    """
+    Забирает из очереди самую старую задачу, в том числе зависшую дольше stale_timeout секунд.
+    Где есть SELECT ... FOR UPDATE SKIP LOCKED, параллельные обработчики пропускают уже заблокированные строки.
+    На SQLite задачу забирает условный UPDATE: статус меняется, только если задачу еще никто не забрал
+    """
+    jobs = claimable_jobs(stale_timeout).order_by("created_at", "id")
+    now = timezone.now()
+    claim = dict(status=ArticlesImportJob.STATUS_RUNNING, worker=worker, started_at=now, updated_at=now)
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = jobs.select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            ArticlesImportJob.objects.filter(pk=job.pk).update(**claim)
+        return ArticlesImportJob.objects.get(pk=job.pk)
+
+    for job_id in jobs.values_list("id", flat=True)[:10]:
+        if claimable_jobs(stale_timeout).filter(pk=job_id).update(**claim):
+            return ArticlesImportJob.objects.get(pk=job_id)
+    return None
+
+
+def run_job(job):
+    """
+    Выполняет импорт. Прогресс сохраняется вместе с каждой пачкой статей, поэтому зависшую задачу
+    другой обработчик продолжит со следующей после сохраненной строки
+    """
+    jobs = ArticlesImportJob.objects.filter(pk=job.pk, worker=job.worker)
+    errors = job.error_list()
+    bytes_read = 0
+
+    def chunks():
+        nonlocal bytes_read
+        for chunk in job.file.chunks():
+            bytes_read += len(chunk)
+            yield chunk
+
+    def on_progress(result):
+        updated = jobs.update(
+            bytes_read=bytes_read,
+            line=max(job.line, result.line),
+            imported=job.imported + result.imported,
+            failed=job.failed + result.failed,
+            errors=json.dumps((errors + result.errors)[:MAX_REPORTED_ERRORS]),
+            updated_at=timezone.now()
+        )
+        if not updated:
+            raise JobLost()
+
+    try:
+        job.file.open("rb")
+        try:
+            encoding = detect_encoding(job.file)
+            rows = (row for row in iter_rows(iter_lines(chunks(), encoding)) if row[0] > job.line)
+            import_rows(job.blog, rows, on_progress=on_progress)
+        finally:
+            job.file.close()
+    except JobLost:
+        logger.warning("Import job %s was taken over by another worker", job.pk)
+        return
+    except Exception as ex:
+        logger.exception("Import job %s failed", job.pk)
+        message = _("Не удалось определить кодировку файла") if isinstance(ex, UnicodeDecodeError) else str(ex)
+        jobs.update(
+            status=ArticlesImportJob.STATUS_FAILED,
+            errors=json.dumps(errors + [(None, message)]),
+            finished_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        return
+
+    if jobs.update(status=ArticlesImportJob.STATUS_DONE, file="", finished_at=timezone.now(),
+                   updated_at=timezone.now()):
+        job.file.delete(save=False)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.db.models.functions import Substr
+
+from app_blogs.cache import invalidate_fragments, invalidate_pages
+from app_blogs.models import BlogArticle
+
+
+class Command(BaseCommand):
+    help = "Заполняет начало записи у статей, сохраненных до его появления"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000,
+                            help="Сколько статей обновлять одним запросом")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        last_id = BlogArticle.objects.aggregate(last=Max("id"))["last"] or 0
+        updated = 0
+
+        for start in range(0, last_id, batch_size):
+            updated += BlogArticle.objects.filter(
+                id__gt=start, id__lte=start + batch_size, excerpt=""
+            ).exclude(content="").update(excerpt=Substr("content", 1, BlogArticle.EXCERPT_LENGTH))
+
+        if updated:
+            # update() не вызывает сигналов и не меняет edit_at, по которому строятся ключи кэша фрагментов
+            invalidate_fragments()
+            invalidate_pages()
+
+        self.stdout.write(self.style.SUCCESS(f"Обновлено статей: {updated}"))
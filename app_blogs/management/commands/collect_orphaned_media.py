@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from app_blogs.deletion import find_orphaned_media
+
+
+class Command(BaseCommand):
+    help = "Удаляет из хранилища файлы, на которые не ссылается ни одна запись в базе"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Только вывести, сколько места освободится")
+        parser.add_argument("--min-age", type=int, default=24 * 60 * 60,
+                            help="Не трогать файлы моложе указанного числа секунд (загрузки, которые еще не сохранены)")
+        parser.add_argument("--batch-size", type=int, default=settings.BLOG_DELETE_BATCH_SIZE,
+                            help="Сколько файлов проверять по базе за один запрос")
+
+    def handle(self, *args, **options):
+        count = size = 0
+        for name, file_size in find_orphaned_media(options["min_age"], options["batch_size"]):
+            if options["verbosity"] > 1:
+                self.stdout.write(name)
+            if not options["dry_run"]:
+                default_storage.delete(name)
+            count += 1
+            size += file_size
+
+        message = "Будет удалено" if options["dry_run"] else "Удалено"
+        self.stdout.write(self.style.SUCCESS(f"{message} файлов: {count} ({size} байт)"))
@@ -0,0 +1,25 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from app_blogs.models import PendingMediaDeletion
+
+
+class Command(BaseCommand):
+    help = "Удаляет из хранилища файлы удаленных блогов и статей"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Сколько файлов удалять за один проход")
+
+    def handle(self, *args, **options):
+        deleted = 0
+        while True:
+            batch = list(PendingMediaDeletion.objects.order_by("id")[:options["batch_size"]])
+            if not batch:
+                break
+
+            for pending in batch:
+                default_storage.delete(pending.name)
+            PendingMediaDeletion.objects.filter(id__in=[pending.id for pending in batch]).delete()
+            deleted += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Удалено файлов: {deleted}"))
@@ -0,0 +1,38 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app_blogs.exporting import EXPORT_FORMATS, iter_export
+from app_blogs.models import BlogArticle
+
+
+class Command(BaseCommand):
+    help = "Выгружает статьи пользователя или одного его блога в CSV (формат импорта) или JSONL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="Автор статей")
+        parser.add_argument("--blog", type=int, default=None, help="Id блога, по умолчанию все блоги пользователя")
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv", help="Формат файла")
+        parser.add_argument("--output", default="-", help="Файл, в который записываются статьи, - для stdout")
+
+    def handle(self, *args, **options):
+        articles = BlogArticle.objects.filter(blog__profile__user__username=options["username"])
+        if options["blog"] is not None:
+            articles = articles.filter(blog_id=options["blog"])
+            if not articles.exists():
+                raise CommandError(f"У пользователя {options['username']} нет статей в блоге {options['blog']}")
+
+        output = sys.stdout.buffer if options["output"] == "-" else open(options["output"], "wb")
+        started = time.monotonic()
+        rows = 0
+        try:
+            for line in iter_export(articles, options["format"]):
+                output.write(line)
+                rows += 1
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+
+        elapsed = time.monotonic() - started
+        self.stderr.write(f"Выгружено статей: {rows} за {elapsed:.1f} с ({rows / max(elapsed, 0.001):.0f} строк/с)")
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app_blogs.benchmarks import generate_data
+
+
+class Command(BaseCommand):
+    help = "Заполняет базу тестовыми пользователями, блогами, статьями и вложениями для нагрузочного тестирования"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20, help="Количество пользователей")
+        parser.add_argument("--blogs", type=int, default=3, help="Блогов у каждого пользователя")
+        parser.add_argument("--articles", type=int, default=50, help="Статей в каждом блоге")
+        parser.add_argument("--files", type=int, default=2, help="Вложений в каждой статье")
+        parser.add_argument("--prefix", default="bench", help="Начало имен создаваемых пользователей")
+        parser.add_argument("--seed", type=int, default=0, help="Начальное значение генератора случайных чисел")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        generate_data(options["users"], options["blogs"], options["articles"], options["files"],
+                      prefix=options["prefix"], seed=options["seed"])
+        self.stdout.write(self.style.SUCCESS(f"Данные созданы за {time.monotonic() - started:.1f} с"))
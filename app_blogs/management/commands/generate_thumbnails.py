@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from app_auth.models import Avatar
+from app_blogs.models import File
+from app_blogs.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Создает миниатюры для уже загруженных вложений статей и аватаров"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Пересоздать и уже существующие миниатюры")
+
+    def handle(self, *args, **options):
+        for model, source_field in ((File, "file"), (Avatar, "avatar")):
+            queryset = model.objects.only("id", source_field, "thumbnail", "thumbnail_webp").order_by("id")
+            if not options["force"]:
+                queryset = queryset.filter(thumbnail="")
+
+            created = skipped = 0
+            for instance in queryset.iterator():
+                if generate_thumbnails(instance, source_field):
+                    created += 1
+                else:
+                    skipped += 1
+
+            self.stdout.write(f"{model._meta.verbose_name_plural}: создано {created}, пропущено {skipped}")
@@ -0,0 +1,130 @@
+import json
+import multiprocessing
+import os
+import time
+
+import django
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+from app_blogs.importing import detect_encoding, import_rows, iter_lines, iter_rows
+from app_blogs.models import Blog
+
+
+def new_checkpoint():
+    return {"line": 0, "imported": 0, "failed": 0, "done": False}
+
+
+def read_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return new_checkpoint()
+
+
+def write_checkpoint(path, state):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(state, file)
+    os.replace(tmp_path, path)
+
+
+def import_file(blog_id, path, batch_size=None, encoding=None, restart=False):
+    """
+    Импортирует статьи из одного файла, разбирая его так же, как импорт через сайт. После каждой пачки
+    номер последней сохраненной строки записывается в файл <path>.checkpoint, повторный запуск продолжает с нее,
+    а полностью загруженный файл пропускает. Функция выполняется и в дочерних процессах, поэтому блог передается по id
+    """
+    checkpoint_path = f"{path}.checkpoint"
+    state = new_checkpoint() if restart else read_checkpoint(checkpoint_path)
+    if state["done"]:
+        return path, state, None, 0.0, []
+
+    blog = Blog.objects.get(id=blog_id)
+    started = time.monotonic()
+
+    def on_progress(result):
+        progress = dict(state, line=max(state["line"], result.line), imported=state["imported"] + result.imported,
+                        failed=state["failed"] + result.failed)
+        # отметка пишется только после фиксации пачки в базе
+        transaction.on_commit(lambda: write_checkpoint(checkpoint_path, progress))
+
+    with open(path, "rb") as raw:
+        file = File(raw)
+        encoding = encoding or detect_encoding(file)
+        rows = (row for row in iter_rows(iter_lines(file.chunks(), encoding)) if row[0] > state["line"])
+        result = import_rows(blog, rows, batch_size, on_progress=on_progress)
+
+    state = dict(state, line=max(state["line"], result.line), imported=state["imported"] + result.imported,
+                 failed=state["failed"] + result.failed, done=True)
+    write_checkpoint(checkpoint_path, state)
+    return path, state, result.imported + result.failed, time.monotonic() - started, result.errors
+
+
+def import_file_args(args):
+    return import_file(*args)
+
+
+class Command(BaseCommand):
+    help = "Импортирует статьи в блог из CSV-файлов на диске (формат title;content, как при загрузке через сайт)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username", help="Владелец блога")
+        parser.add_argument("blog_id", type=int, help="Id блога")
+        parser.add_argument("files", nargs="+", help="CSV-файлы со статьями")
+        parser.add_argument("--batch-size", type=int, default=None, help="Сколько статей сохранять одним запросом")
+        parser.add_argument("--processes", type=int, default=1, help="Сколько файлов загружать параллельно")
+        parser.add_argument("--encoding", default=None, help="Кодировка файлов, по умолчанию определяется по файлу")
+        parser.add_argument("--restart", action="store_true", help="Загрузить файлы заново, не глядя на отметки")
+
+    def handle(self, *args, **options):
+        blog = Blog.objects.filter(id=options["blog_id"], profile__user__username=options["username"]).first()
+        if blog is None:
+            raise CommandError(f"У пользователя {options['username']} нет блога {options['blog_id']}")
+
+        paths = [os.path.abspath(path) for path in options["files"]]
+        for path in paths:
+            if not os.path.isfile(path):
+                raise CommandError(f"Файл {path} не найден")
+
+        tasks = [(blog.id, path, options["batch_size"], options["encoding"], options["restart"]) for path in paths]
+        processes = min(options["processes"], len(tasks))
+        if processes > 1 and connection.vendor == "sqlite":
+            # SQLite пропускает только одну пишущую транзакцию, параллельные процессы падали бы на блокировке
+            self.stderr.write("SQLite не поддерживает параллельную запись, файлы загружаются в одном процессе")
+            processes = 1
+        started = time.monotonic()
+        rows = 0
+
+        try:
+            if processes > 1:
+                # дочерние процессы не должны унаследовать открытые соединения с базой
+                connections.close_all()
+                with multiprocessing.Pool(processes, initializer=django.setup) as pool:
+                    for result in pool.imap_unordered(import_file_args, tasks):
+                        rows += self.report(*result)
+            else:
+                for task in tasks:
+                    rows += self.report(*import_file(*task))
+        except UnicodeDecodeError:
+            raise CommandError("Не удалось определить кодировку файла, укажите ее в --encoding")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Обработано строк: {rows} за {elapsed:.1f} с ({rows / max(elapsed, 0.001):.0f} строк/с)"
+        ))
+
+    def report(self, path, state, rows, elapsed, errors):
+        if rows is None:
+            self.stdout.write(f"{path}: уже загружен, пропущен")
+            return 0
+
+        for line, message in errors:
+            self.stderr.write(f"{path}:{line}: {message}")
+        self.stdout.write(
+            f"{path}: импортировано {state['imported']}, с ошибками {state['failed']}, "
+            f"{rows / max(elapsed, 0.001):.0f} строк/с"
+        )
+        return rows
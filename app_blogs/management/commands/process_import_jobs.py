@@ -0,0 +1,41 @@
+import os
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from app_blogs.jobs import claim_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Обрабатывает очередь импорта статей из CSV. Можно запускать несколько обработчиков одновременно"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true",
+                            help="Обработать задачи, которые уже есть в очереди, и завершиться")
+        parser.add_argument("--poll-interval", type=float, default=settings.BLOG_ARTICLES_IMPORT_POLL_INTERVAL,
+                            help="Пауза между опросами пустой очереди, в секундах")
+        parser.add_argument("--stale-timeout", type=int, default=settings.BLOG_ARTICLES_IMPORT_STALE_TIMEOUT,
+                            help="Через сколько секунд без прогресса задача другого обработчика считается зависшей")
+        parser.add_argument("--worker", default=f"{socket.gethostname()}:{os.getpid()}",
+                            help="Имя обработчика")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+
+            job = claim_job(options["worker"], options["stale_timeout"])
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Задача {job.id}: импорт в блог {job.blog_id}")
+            run_job(job)
+
+            job.refresh_from_db()
+            self.stdout.write(f"Задача {job.id}: {job.get_status_display()}, "
+                              f"импортировано {job.imported}, с ошибками {job.failed}")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app_blogs.models import BlogArticle
+from app_blogs.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Заново строит поисковый индекс по всем статьям блогов"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_search_index()
+
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано статей: {BlogArticle.objects.count()}"))
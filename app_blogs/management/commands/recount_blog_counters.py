@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from app_blogs.models import Blog, BlogArticle, File
+
+
+def count_subquery(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")}).order_by().values(field).annotate(cnt=Count("pk")).values("cnt"),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает сохраненные счетчики статей в блогах и файлов в статьях"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            blogs = Blog.objects.update(articles_counter=count_subquery(BlogArticle.objects.all(), "blog"))
+            articles = BlogArticle.objects.update(files_counter=count_subquery(File.objects.all(), "blog_article"))
+
+        self.stdout.write(self.style.SUCCESS(f"Пересчитано блогов: {blogs}, статей: {articles}"))
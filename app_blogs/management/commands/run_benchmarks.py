@@ -0,0 +1,90 @@
+import json
+import subprocess
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from app_blogs.benchmarks import compare_results, generate_data, get_scenarios, run_benchmarks
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+        ).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Замеряет время ответа, количество запросов и пиковую память главных страниц, админки и импорта CSV. " \
+           "Данные генерируются в отдельной тестовой базе, рабочая база не затрагивается"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20, help="Количество пользователей")
+        parser.add_argument("--blogs", type=int, default=3, help="Блогов у каждого пользователя")
+        parser.add_argument("--articles", type=int, default=50, help="Статей в каждом блоге")
+        parser.add_argument("--files", type=int, default=2, help="Вложений в каждой статье")
+        parser.add_argument("--seed", type=int, default=0, help="Начальное значение генератора случайных чисел")
+        parser.add_argument("--import-rows", type=int, default=500, help="Строк в одном замере импорта CSV")
+        parser.add_argument("--repeat", type=int, default=20, help="Сколько раз повторять каждый замер")
+        parser.add_argument("--warmup", type=int, default=2, help="Сколько прогонов сделать до замеров")
+        parser.add_argument("--only", nargs="+", default=None, help="Выполнить только указанные сценарии")
+        parser.add_argument("--output", default=None, help="JSON-файл для результатов")
+        parser.add_argument("--compare", default=None, help="JSON-файл прошлого прогона для сравнения")
+
+    def handle(self, *args, **options):
+        previous = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as file:
+                previous = json.load(file)["results"]
+
+        # замеры идут как на рабочем сервере: без журнала запросов и отладки шаблонов
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.monotonic()
+            generate_data(options["users"], options["blogs"], options["articles"], options["files"],
+                          seed=options["seed"])
+            self.stdout.write(f"Данные созданы за {time.monotonic() - started:.1f} с")
+
+            scenarios = get_scenarios(import_rows_count=options["import_rows"])
+            unknown = set(options["only"] or ()) - {scenario.name for scenario in scenarios}
+            if unknown:
+                raise CommandError(f"Неизвестные сценарии: {', '.join(sorted(unknown))}")
+            results = run_benchmarks(scenarios, options["repeat"], options["warmup"], options["only"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:16} p50 {result['p50_ms']:8.2f} мс  p95 {result['p95_ms']:8.2f} мс  "
+                f"запросов {result['queries']:3}  память {result['peak_memory_kb']:9.1f} КБ"
+            )
+
+        if previous is not None:
+            self.stdout.write("Сравнение с прошлым прогоном:")
+            for name, before, after, change, queries_before, queries_after in compare_results(previous, results):
+                line = f"{name:16} p50 {before:8.2f} -> {after:8.2f} мс ({change:+.1f}%)  " \
+                       f"запросов {queries_before} -> {queries_after}"
+                style = self.style.WARNING if queries_after > queries_before else self.style.SUCCESS
+                self.stdout.write(style(line))
+
+        if options["output"]:
+            report = {
+                "created_at": timezone.now().isoformat(),
+                "revision": git_revision(),
+                "database": connection.vendor,
+                "options": {name: options[name] for name in (
+                    "users", "blogs", "articles", "files", "seed", "import_rows", "repeat", "warmup",
+                )},
+                "results": results,
+            }
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Результаты сохранены в {options['output']}"))
@@ -0,0 +1,105 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from .cache import cache_page_response, get_cached_page, get_generation, is_page_cacheable, page_cache_key
+from .uploadhandlers import LimitedUploadHandler
+
+
+class AnonymousPageCacheMixin:
+    """
+    Отдает анонимным пользователям страницу из кэша. Ключ зависит от адреса страницы и текущего языка
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not is_page_cacheable(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = page_cache_key(request)
+        response = get_cached_page(request, key)
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, "add_post_render_callback"):
+            response.add_post_render_callback(lambda rendered: cache_page_response(key, rendered))
+        else:
+            cache_page_response(key, response)
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 Not Modified до рендеринга шаблона, если страница не менялась.
+    Last-Modified берется из get_last_modified(). ETag строится из той же даты, языка и пользователя
+    (от него зависят ссылки редактирования). Если даты изменения у страницы нет, вместо нее в ETag входит
+    поколение кэша страниц, которое меняется при любом изменении на сайте
+    """
+
+    def get_last_modified(self):
+        return None
+
+    def get_etag(self, last_modified):
+        user = self.request.user.pk if self.request.user.is_authenticated else ""
+        version = last_modified.timestamp() if last_modified else get_generation()
+        value = ":".join(str(part) for part in (self.request.get_full_path(), get_language(), user, version))
+        return quote_etag(hashlib.md5(value.encode("utf-8")).hexdigest())
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+
+        last_modified = self.get_last_modified()
+        etag = self.get_etag(last_modified)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code == 200:
+                response["ETag"] = etag
+                if timestamp is not None:
+                    response["Last-Modified"] = http_date(timestamp)
+        return response
+
+
+class CachedObjectMixin:
+    """
+    Запоминает объект страницы на время запроса, чтобы повторные вызовы get_object() не ходили в базу
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, "_cached_object"):
+            self._cached_object = super().get_object()
+        return self._cached_object
+
+
+class UploadLimitsMixin:
+    """
+    Ограничивает файлы из полей upload_fields во время чтения запроса. Обработчик загрузки нужно добавить
+    до разбора тела запроса, а CsrfViewMiddleware разбирает его раньше представления, поэтому CSRF-токен
+    проверяется уже здесь, после установки обработчика
+    """
+    upload_fields = ()
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        handler = LimitedUploadHandler(request, self.upload_fields)
+        request.upload_handlers.insert(0, handler)
+        request.upload_errors = handler.errors
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+    def form_is_valid(self, form):
+        """
+        Проверяет форму и добавляет в нее ошибки отклоненных файлов
+        """
+        is_valid = form.is_valid()
+        for field, message in self.request.upload_errors:
+            form.add_error(field, message)
+        return is_valid and not self.request.upload_errors
@@ -1,3 +1,4 @@
+import json
 import os
 
 from django.db import models
@@ -10,10 +11,12 @@ class Blog(models.Model):
     title = models.CharField(max_length=200, verbose_name=_("Название блога"))
     description = models.TextField(max_length=1000, blank=True, default="", verbose_name=_("Краткое описание"))
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Дата создания"))
+    edit_at = models.DateTimeField(auto_now=True, verbose_name=_("Дата последнего изменения"))
     profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, verbose_name=_("Автор блога"))
+    articles_counter = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Кол-во записей в блоге"))
 
     def articles_count(self):
-        return BlogArticle.objects.filter(blog=self).count()
+        return self.articles_counter
 
     def __str__(self):
         return self.title
@@ -21,6 +24,20 @@ class Blog(models.Model):
     class Meta:
         verbose_name= _("блог")
         verbose_name_plural = _("блоги")
+        indexes = (
+            models.Index(fields=("profile", "-created_at", "-id"), name="blog_profile_created_idx"),
+        )
+
+
+class BlogArticleQuerySet(models.QuerySet):
+    def listing(self):
+        """
+        Статьи для вывода в списках: блог и автор подтягиваются одним запросом и только нужные поля
+        """
+        return self.select_related("blog__profile__user").only(
+            "title", "excerpt", "created_at", "edit_at",
+            "blog__title", "blog__edit_at", "blog__profile__user__username",
+        )
 
 
 class BlogArticle(models.Model):
@@ -29,12 +46,38 @@ class BlogArticle(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Дата создания"))
     edit_at = models.DateTimeField(auto_now=True, verbose_name=_("Дата последнего изменения"))
     blog = models.ForeignKey("Blog", on_delete=models.CASCADE, verbose_name=_("Блог"))
+    files_counter = models.PositiveIntegerField(default=0, editable=False, verbose_name=_("Кол-во файлов"))
+    excerpt = models.CharField(max_length=100, blank=True, default="", editable=False,
+                               verbose_name=_("Начало записи"))
+
+    objects = BlogArticleQuerySet.as_manager()
+
+    EXCERPT_LENGTH = 100
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # блог, в котором статья сохранена, нужен сигналам для счетчиков при переносе статьи в другой блог
+        instance._loaded_blog_id = instance.__dict__.get("blog_id")
+        return instance
+
+    @classmethod
+    def make_excerpt(cls, content):
+        return content[:cls.EXCERPT_LENGTH]
+
+    def save(self, *args, **kwargs):
+        # начало статьи хранится отдельно, чтобы списки статей не загружали их текст целиком
+        self.excerpt = self.make_excerpt(self.content)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "content" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"excerpt"}
+        super().save(*args, **kwargs)
 
     def files_count(self):
-        return File.objects.filter(blog_article=self).count()
+        return self.files_counter
 
     def short_content(self):
-        return self.content[:100]
+        return self.excerpt
 
     def __str__(self):
         return self.title
@@ -42,15 +85,98 @@ class BlogArticle(models.Model):
     class Meta:
         verbose_name = _("статья блога")
         verbose_name_plural = _("статьи блога")
+        indexes = (
+            models.Index(fields=("-created_at", "-id"), name="article_created_idx"),
+            models.Index(fields=("blog", "-created_at", "-id"), name="article_blog_created_idx"),
+            models.Index(fields=("blog", "edit_at"), name="article_blog_edit_at_idx"),
+        )
 
 
 class File(models.Model):
     file = models.FileField(upload_to="files/", verbose_name=_("Файл"))
+    thumbnail = models.FileField(upload_to="thumbnails/", blank=True, editable=False, verbose_name=_("Миниатюра"))
+    thumbnail_webp = models.FileField(upload_to="thumbnails/", blank=True, editable=False,
+                                      verbose_name=_("Миниатюра WebP"))
     blog_article = models.ForeignKey("BlogArticle", on_delete=models.CASCADE, verbose_name=_("Статья блога"))
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_blog_article_id = instance.__dict__.get("blog_article_id")
+        return instance
+
     def __str__(self):
         return os.path.basename(str(self.file))
 
     class Meta:
         verbose_name = _("файл")
         verbose_name_plural = _("файлы")
+
+
+class ArticlesImportJob(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (STATUS_PENDING, _("В очереди")),
+        (STATUS_RUNNING, _("Выполняется")),
+        (STATUS_DONE, _("Завершен")),
+        (STATUS_FAILED, _("Ошибка")),
+    )
+
+    blog = models.ForeignKey("Blog", on_delete=models.CASCADE, verbose_name=_("Блог"))
+    file = models.FileField(upload_to="imports/", blank=True, verbose_name=_("Файл"))
+    size = models.BigIntegerField(default=0, verbose_name=_("Размер файла"))
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True,
+                              verbose_name=_("Статус"))
+    worker = models.CharField(max_length=100, blank=True, verbose_name=_("Обработчик"))
+    bytes_read = models.BigIntegerField(default=0, verbose_name=_("Прочитано байт"))
+    line = models.PositiveIntegerField(default=0, verbose_name=_("Последняя обработанная строка"))
+    imported = models.PositiveIntegerField(default=0, verbose_name=_("Импортировано статей"))
+    failed = models.PositiveIntegerField(default=0, verbose_name=_("Строк с ошибками"))
+    errors = models.TextField(blank=True, default="[]", verbose_name=_("Ошибки"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Дата создания"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Дата последнего изменения"))
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Дата начала"))
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Дата завершения"))
+
+    def error_list(self):
+        return json.loads(self.errors or "[]")
+
+    def progress(self):
+        if self.status == self.STATUS_DONE:
+            return 100
+        if not self.size:
+            return 0
+        return min(100, self.bytes_read * 100 // self.size)
+
+    def is_active(self):
+        return self.status in (self.STATUS_PENDING, self.STATUS_RUNNING)
+
+    def __str__(self):
+        return f"{self.blog} #{self.id}"
+
+    class Meta:
+        verbose_name = _("импорт статей")
+        verbose_name_plural = _("импорты статей")
+        indexes = (
+            models.Index(fields=("status", "created_at", "id"), name="import_job_queue_idx"),
+        )
+
+
+class PendingMediaDeletion(models.Model):
+    """
+    Файл хранилища, который нужно удалить. Заполняется при массовом удалении блогов и статей,
+    сами файлы удаляет команда delete_pending_media
+    """
+    name = models.CharField(max_length=255, verbose_name=_("Файл"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Дата создания"))
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = _("файл к удалению")
+        verbose_name_plural = _("файлы к удалению")
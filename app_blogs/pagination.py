@@ -0,0 +1,166 @@
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections, router
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes, force_text
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.translation import gettext_lazy as _
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPage:
+    """
+    Страница курсорной пагинации. В отличие от обычной страницы не знает ни своего номера,
+    ни общего количества страниц, только курсоры на соседние страницы
+    """
+
+    def __init__(self, object_list, paginator, has_newer, has_older):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.has_newer = has_newer
+        self.has_older = has_older
+
+    @property
+    def newer_cursor(self):
+        if self.has_newer and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[0])
+        return None
+
+    @property
+    def older_cursor(self):
+        if self.has_older and self.object_list:
+            return self.paginator.encode_cursor(self.object_list[-1])
+        return None
+
+    def has_other_pages(self):
+        return self.has_newer or self.has_older
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+
+class KeysetPaginator:
+    """
+    Курсорная (keyset) пагинация по паре (field, id) в порядке убывания.
+    Стоимость выборки любой страницы одинакова, т.к. вместо OFFSET используется условие
+    на значения последней показанной записи
+    """
+
+    def __init__(self, queryset, per_page, field="created_at"):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.field = field
+
+    def encode_cursor(self, obj):
+        value = getattr(obj, self.field)
+        return urlsafe_base64_encode(force_bytes(f"{value.isoformat()}_{obj.pk}"))
+
+    def decode_cursor(self, cursor):
+        try:
+            value, pk = force_text(urlsafe_base64_decode(cursor)).rsplit("_", 1)
+            value, pk = parse_datetime(value), int(pk)
+        except (TypeError, ValueError):
+            raise InvalidCursor(_("Неверный курсор"))
+        if value is None:
+            raise InvalidCursor(_("Неверный курсор"))
+        return value, pk
+
+    def page(self, older=None, newer=None):
+        field = self.field
+        limit = self.per_page + 1
+
+        if newer:
+            value, pk = self.decode_cursor(newer)
+            queryset = self.queryset.filter(
+                Q(**{f"{field}__gte": value}) & (Q(**{f"{field}__gt": value}) | Q(pk__gt=pk))
+            ).order_by(field, "pk")
+            object_list = list(queryset[:limit])
+            has_newer = len(object_list) == limit
+            object_list = object_list[:self.per_page][::-1]
+            return KeysetPage(object_list, self, has_newer=has_newer, has_older=True)
+
+        queryset = self.queryset
+        if older:
+            value, pk = self.decode_cursor(older)
+            queryset = queryset.filter(
+                Q(**{f"{field}__lte": value}) & (Q(**{f"{field}__lt": value}) | Q(pk__lt=pk))
+            )
+        object_list = list(queryset.order_by(f"-{field}", "-pk")[:limit])
+        has_older = len(object_list) == limit
+        return KeysetPage(object_list[:self.per_page], self, has_newer=bool(older), has_older=has_older)
+
+
+class KeysetPaginationMixin:
+    """
+    Подменяет стандартную постраничную навигацию ListView на курсорную.
+    Курсоры передаются в GET-параметрах older и newer
+    """
+    paginator_class = KeysetPaginator
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return self.paginator_class(queryset, per_page)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(queryset, page_size)
+        try:
+            page = paginator.page(older=self.request.GET.get("older"), newer=self.request.GET.get("newer"))
+        except InvalidCursor as ex:
+            raise Http404(str(ex))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+def estimate_count(model):
+    """
+    Примерное количество строк в таблице модели по статистике БД (после ANALYZE).
+    Возвращает None, если статистики нет или БД ее не поддерживает
+    """
+    connection = connections[router.db_for_read(model)]
+    table = model._meta.db_table
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+                [table]
+            )
+        elif connection.vendor == "sqlite":
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute("SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Для выборки без фильтров из большой таблицы берет количество строк из статистики БД вместо COUNT(*),
+    который на больших таблицах читает ее целиком. Отфильтрованные выборки и небольшие таблицы считаются точно
+    """
+    threshold = 10000
+
+    @cached_property
+    def count(self):
+        if isinstance(self.object_list, QuerySet) and not self.object_list.query.where:
+            estimate = estimate_count(self.object_list.model)
+            if estimate is not None and estimate > self.threshold:
+                return estimate
+        return super().count
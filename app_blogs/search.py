@@ -0,0 +1,235 @@
+import re
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Blog, BlogArticle
+
+
+TABLE = "app_blogs_search"
+
+MARK_START, MARK_END = "\x02", "\x03"
+
+MAX_TERMS = 10
+
+TERM_RE = re.compile(r"\w+")
+
+SearchResult = namedtuple("SearchResult", ("article", "title", "snippet"))
+
+
+def highlight(text):
+    """
+    Экранирует фрагмент текста статьи и заменяет метки найденных слов на <mark>
+    """
+    html = escape(text or "").replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+    return mark_safe(html)
+
+
+def source_sql(where):
+    """
+    Выборка статей вместе с названием и описанием блога для записи в индекс
+    """
+    article, blog = BlogArticle._meta.db_table, Blog._meta.db_table
+    return (
+        f"SELECT a.id, a.title, a.content, b.title, b.description "
+        f"FROM {article} a INNER JOIN {blog} b ON b.id = a.blog_id WHERE {where}"
+    )
+
+
+class SQLiteSearchBackend:
+    """
+    Индекс в виртуальной таблице FTS5, id статьи хранится в rowid. Результаты сортируются по bm25,
+    совпадения в заголовке статьи весят больше, чем в тексте
+    """
+
+    def create_index(self, cursor):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [TABLE])
+        if cursor.fetchone() is not None:
+            return False
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {TABLE} USING fts5("
+            f"title, content, blog_title, blog_description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        return True
+
+    def index(self, cursor, where, params):
+        ids = f"SELECT a.id FROM {BlogArticle._meta.db_table} a WHERE {where}"
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid IN ({ids})", params)
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, title, content, blog_title, blog_description) {source_sql(where)}", params
+        )
+
+    def remove(self, cursor, article_ids):
+        placeholders = ", ".join(["%s"] * len(article_ids))
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid IN ({placeholders})", list(article_ids))
+
+    def clear(self, cursor):
+        cursor.execute(f"DELETE FROM {TABLE}")
+
+    def build_query(self, query):
+        terms = TERM_RE.findall(query.lower())[:MAX_TERMS]
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def count(self, cursor, query):
+        cursor.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE {TABLE} MATCH %s", [query])
+        return cursor.fetchone()[0]
+
+    def search(self, cursor, query, offset, limit):
+        cursor.execute(
+            f"SELECT rowid, highlight({TABLE}, 0, %s, %s), snippet({TABLE}, 1, %s, %s, '…', 30) "
+            f"FROM {TABLE} WHERE {TABLE} MATCH %s "
+            f"ORDER BY bm25({TABLE}, 10.0, 1.0, 5.0, 2.0), rowid DESC LIMIT %s OFFSET %s",
+            [MARK_START, MARK_END, MARK_START, MARK_END, query, limit, offset]
+        )
+        return cursor.fetchall()
+
+
+class PostgresSearchBackend:
+    """
+    Индекс в таблице с колонкой tsvector и GIN-индексом. Заголовок статьи, название блога, текст
+    и описание блога получают веса A, B, C и D, результаты сортируются по ts_rank
+    """
+
+    def document_sql(self):
+        config = settings.SEARCH_POSTGRES_CONFIG
+        return (
+            f"setweight(to_tsvector('{config}', a.title), 'A') || "
+            f"setweight(to_tsvector('{config}', b.title), 'B') || "
+            f"setweight(to_tsvector('{config}', a.content), 'C') || "
+            f"setweight(to_tsvector('{config}', b.description), 'D')"
+        )
+
+    def create_index(self, cursor):
+        cursor.execute("SELECT to_regclass(%s)", [TABLE])
+        if cursor.fetchone()[0] is not None:
+            return False
+        cursor.execute(f"CREATE TABLE {TABLE} (article_id integer PRIMARY KEY, document tsvector NOT NULL)")
+        cursor.execute(f"CREATE INDEX {TABLE}_document_idx ON {TABLE} USING GIN (document)")
+        return True
+
+    def index(self, cursor, where, params):
+        cursor.execute(
+            f"INSERT INTO {TABLE} (article_id, document) "
+            f"SELECT a.id, {self.document_sql()} FROM {BlogArticle._meta.db_table} a "
+            f"INNER JOIN {Blog._meta.db_table} b ON b.id = a.blog_id WHERE {where} "
+            f"ON CONFLICT (article_id) DO UPDATE SET document = EXCLUDED.document",
+            params
+        )
+
+    def remove(self, cursor, article_ids):
+        cursor.execute(f"DELETE FROM {TABLE} WHERE article_id = ANY(%s)", [list(article_ids)])
+
+    def clear(self, cursor):
+        cursor.execute(f"TRUNCATE {TABLE}")
+
+    def build_query(self, query):
+        terms = TERM_RE.findall(query.lower())[:MAX_TERMS]
+        return " & ".join(f"{term}:*" for term in terms)
+
+    def count(self, cursor, query):
+        config = settings.SEARCH_POSTGRES_CONFIG
+        cursor.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE document @@ to_tsquery('{config}', %s)", [query])
+        return cursor.fetchone()[0]
+
+    def search(self, cursor, query, offset, limit):
+        config = settings.SEARCH_POSTGRES_CONFIG
+        options = f"StartSel={MARK_START}, StopSel={MARK_END}, MaxWords=35, MinWords=15"
+        cursor.execute(
+            f"SELECT s.article_id, ts_headline('{config}', a.title, q, 'HighlightAll=true, ' || %s), "
+            f"ts_headline('{config}', a.content, q, %s) "
+            f"FROM (SELECT article_id, ts_rank(document, q) AS rank, q FROM {TABLE}, "
+            f"to_tsquery('{config}', %s) q WHERE document @@ q "
+            f"ORDER BY rank DESC, article_id DESC LIMIT %s OFFSET %s) s "
+            f"INNER JOIN {BlogArticle._meta.db_table} a ON a.id = s.article_id "
+            f"ORDER BY s.rank DESC, s.article_id DESC",
+            [options, options, query, limit, offset]
+        )
+        return cursor.fetchall()
+
+
+def get_backend():
+    if connection.vendor == "postgresql":
+        return PostgresSearchBackend()
+    return SQLiteSearchBackend()
+
+
+def create_search_index():
+    """
+    Создает индекс, если его еще нет, и заполняет его уже существующими статьями. Вызывается после любой
+    миграции, в том числе до создания таблиц статей, и после flush, который очищает таблицы моделей, но не индекс
+    """
+    if BlogArticle._meta.db_table not in connection.introspection.table_names():
+        return
+
+    backend = get_backend()
+    # индекс создается и заполняется в одной транзакции, чтобы не остаться созданным, но пустым
+    with transaction.atomic(), connection.cursor() as cursor:
+        backend.create_index(cursor)
+        cursor.execute(f"SELECT 1 FROM {TABLE} LIMIT 1")
+        index_is_empty = cursor.fetchone() is None
+        if not BlogArticle.objects.exists():
+            if not index_is_empty:
+                backend.clear(cursor)
+        elif index_is_empty:
+            backend.index(cursor, "1 = 1", [])
+
+
+def rebuild_search_index():
+    backend = get_backend()
+    with connection.cursor() as cursor:
+        backend.create_index(cursor)
+        backend.clear(cursor)
+        backend.index(cursor, "1 = 1", [])
+
+
+def index_article(article_id):
+    with connection.cursor() as cursor:
+        get_backend().index(cursor, "a.id = %s", [article_id])
+
+
+def index_blog(blog_id, after_id=None):
+    """
+    Переиндексирует статьи блога. С after_id - только статьи, добавленные после статьи с этим id
+    """
+    where, params = "a.blog_id = %s", [blog_id]
+    if after_id is not None:
+        where, params = where + " AND a.id > %s", params + [after_id]
+    with connection.cursor() as cursor:
+        get_backend().index(cursor, where, params)
+
+
+def remove_articles(article_ids):
+    if article_ids:
+        with connection.cursor() as cursor:
+            get_backend().remove(cursor, article_ids)
+
+
+class SearchResults:
+    """
+    Результаты поиска для Paginator: количество и страницы запрашиваются у индекса по мере надобности
+    """
+
+    def __init__(self, query):
+        self.backend = get_backend()
+        self.query = self.backend.build_query(query)
+
+    def count(self):
+        if not self.query:
+            return 0
+        with connection.cursor() as cursor:
+            return self.backend.count(cursor, self.query)
+
+    def __getitem__(self, index):
+        if not self.query:
+            return []
+        with connection.cursor() as cursor:
+            rows = self.backend.search(cursor, self.query, index.start or 0, index.stop - (index.start or 0))
+
+        articles = BlogArticle.objects.listing().in_bulk([row[0] for row in rows])
+        return [
+            SearchResult(articles[article_id], highlight(title), highlight(snippet))
+            for article_id, title, snippet in rows if article_id in articles
+        ]
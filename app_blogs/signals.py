@@ -0,0 +1,124 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from app_auth.models import Avatar, UserProfile
+
+from .cache import invalidate_pages
+from .models import Blog, BlogArticle, File
+from .search import index_article, index_blog, remove_articles
+
+
+def update_articles_counter(blog_id, delta):
+    blogs = Blog.objects.filter(pk=blog_id)
+    if delta < 0:
+        blogs = blogs.filter(articles_counter__gte=-delta)
+    # добавление и удаление статей меняет страницу блога, поэтому сдвигаем и дату его изменения
+    blogs.update(articles_counter=F("articles_counter") + delta, edit_at=timezone.now())
+
+
+def update_files_counter(blog_article_id, delta):
+    articles = BlogArticle.objects.filter(pk=blog_article_id)
+    if delta < 0:
+        articles = articles.filter(files_counter__gte=-delta)
+    # вложения выводятся на странице статьи, поэтому сдвигаем и дату ее изменения
+    articles.update(files_counter=F("files_counter") + delta, edit_at=timezone.now())
+
+
+@receiver(post_save, sender=BlogArticle)
+def blog_article_created(sender, instance, created, **kwargs):
+    if created:
+        update_articles_counter(instance.blog_id, 1)
+        if BlogArticle.blog.is_cached(instance):
+            instance.blog.articles_counter += 1
+
+
+def moved_from(instance, field, created, update_fields):
+    """
+    Id прежнего родителя, если объект сохранили с другим значением внешнего ключа field, иначе None
+    """
+    attname = instance._meta.get_field(field).attname
+    loaded = f"_loaded_{attname}"
+    previous = getattr(instance, loaded, None)
+    if update_fields is None or {field, attname} & set(update_fields):
+        setattr(instance, loaded, getattr(instance, attname))
+        if not created and previous is not None and previous != getattr(instance, attname):
+            return previous
+    return None
+
+
+@receiver(post_save, sender=BlogArticle)
+def blog_article_moved(sender, instance, created, update_fields=None, **kwargs):
+    previous = moved_from(instance, "blog", created, update_fields)
+    if previous is not None:
+        update_articles_counter(previous, -1)
+        update_articles_counter(instance.blog_id, 1)
+
+
+@receiver(post_delete, sender=BlogArticle)
+def blog_article_deleted(sender, instance, **kwargs):
+    update_articles_counter(instance.blog_id, -1)
+
+
+@receiver(post_save, sender=BlogArticle)
+def blog_article_saved(sender, instance, **kwargs):
+    index_article(instance.id)
+
+
+@receiver(post_delete, sender=BlogArticle)
+def blog_article_removed(sender, instance, **kwargs):
+    remove_articles([instance.id])
+
+
+@receiver(post_save, sender=Blog)
+def blog_saved(sender, instance, created, update_fields=None, **kwargs):
+    # название и описание блога тоже есть в поисковом индексе его статей
+    if not created and (update_fields is None or {"title", "description"} & set(update_fields)):
+        index_blog(instance.id)
+
+
+@receiver(post_save, sender=File)
+def file_created(sender, instance, created, **kwargs):
+    if created:
+        update_files_counter(instance.blog_article_id, 1)
+        if File.blog_article.is_cached(instance):
+            instance.blog_article.files_counter += 1
+
+
+@receiver(post_save, sender=File)
+def file_moved(sender, instance, created, update_fields=None, **kwargs):
+    previous = moved_from(instance, "blog_article", created, update_fields)
+    if previous is not None:
+        update_files_counter(previous, -1)
+        update_files_counter(instance.blog_article_id, 1)
+
+
+@receiver(post_delete, sender=File)
+def file_deleted(sender, instance, **kwargs):
+    update_files_counter(instance.blog_article_id, -1)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+@receiver(post_save, sender=BlogArticle)
+@receiver(post_delete, sender=BlogArticle)
+@receiver(post_save, sender=File)
+@receiver(post_delete, sender=File)
+@receiver(post_save, sender=Avatar)
+@receiver(post_delete, sender=Avatar)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_delete, sender=get_user_model())
+def page_content_changed(sender, **kwargs):
+    # кэш сбрасывается после фиксации транзакции, иначе страницу со старыми данными успели бы закэшировать заново
+    transaction.on_commit(invalidate_pages)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_changed(sender, update_fields=None, **kwargs):
+    # при каждом входе пользователя сохраняется last_login, на страницах он не выводится
+    if update_fields is None or set(update_fields) != {"last_login"}:
+        transaction.on_commit(invalidate_pages)
@@ -0,0 +1,7 @@
+from django import template
+
+from ..cache import get_fragments_version
+
+register = template.Library()
+
+register.simple_tag(get_fragments_version, name="fragments_version")
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from app_auth.models import UserProfile
+
+from ..access import has_access
+from ..models import Blog, BlogArticle, File
+
+from .utils import TestCaseMixin
+
+
+class AccessTest(TestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.blog = Blog.objects.create(title="Blog", profile=cls.profile)
+        cls.article = BlogArticle.objects.create(title="Article", content="Content", blog=cls.blog)
+        cls.file = File.objects.create(file="files/file.jpg", blog_article=cls.article)
+
+        cls.other_profile = UserProfile.objects.create(user=get_user_model().objects.create(username="other"))
+        cls.other_blog = Blog.objects.create(title="Other", profile=cls.other_profile)
+
+    def create_request(self, user, url=None):
+        url = url or reverse("blog", args=(self.profile.user.username, self.blog.id))
+        request = RequestFactory().get(url)
+        request.user = user
+        request.resolver_match = resolve(url)
+        return request
+
+    def test_ownership(self):
+        """
+        Проверка, что доступ к объекту есть только у его владельца
+        """
+        request = self.create_request(self.profile.user)
+        for obj in (self.profile, self.blog, self.article, self.file):
+            self.assertTrue(has_access(request, obj), obj)
+        self.assertFalse(has_access(request, self.other_profile))
+        self.assertFalse(has_access(request, self.other_blog))
+
+        request = self.create_request(AnonymousUser())
+        self.assertFalse(has_access(request, self.blog))
+        self.assertFalse(has_access(request))
+
+    def test_url_access(self):
+        """
+        Проверка, что без объекта доступ определяется по пользователю из адреса страницы
+        """
+        self.assertTrue(has_access(self.create_request(self.profile.user)))
+
+        url = reverse("blog", args=(self.other_profile.user.username, self.other_blog.id))
+        self.assertFalse(has_access(self.create_request(self.profile.user, url)))
+
+    def test_cached_per_request(self):
+        """
+        Проверка, что доступ вычисляется один раз за запрос для каждого объекта
+        """
+        request = self.create_request(self.profile.user)
+        with mock.patch("app_blogs.access.check_access", return_value=True) as check_access:
+            for _ in range(3):
+                has_access(request, self.blog)
+                has_access(request)
+        self.assertEquals(check_access.call_count, 2)
+
+        with mock.patch("app_blogs.access.check_access", return_value=True) as check_access:
+            has_access(self.create_request(self.profile.user), self.blog)
+        self.assertEquals(check_access.call_count, 1)
+
+    def test_owner_page_queries(self):
+        """
+        Проверка, что количество запросов на странице блога у владельца не зависит от количества статей
+        """
+        self.login_test()
+        url = reverse("blog", args=(self.profile.user.username, self.blog.id))
+        self.client.get(url)
+
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertContains(response, reverse("edit_blog_article", args=(self.profile.user.username, self.blog.id, self.article.id)))
+
+        for i in range(10):
+            BlogArticle.objects.create(title=f"Article {i}", content="Content", blog=self.blog)
+        with self.assertNumQueries(5):
+            self.client.get(url)
+
+    def test_other_user_blog_forbidden(self):
+        """
+        Проверка, что чужой блог нельзя редактировать
+        """
+        self.login_test()
+        response = self.client.get(reverse("edit_blog", args=(self.other_profile.user.username, self.other_blog.id)))
+        self.assertEquals(response.status_code, 403)
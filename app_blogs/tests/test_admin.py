@@ -0,0 +1,153 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Blog, BlogArticle, File, PendingMediaDeletion
+from ..pagination import EstimatedCountPaginator, estimate_count
+
+from .utils import TestCaseMixin
+
+
+class AdminTest(TestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.admin = get_user_model().objects.create_superuser("admin", "admin@example.com", "admin12345")
+        cls.blog = Blog.objects.create(title="Blog", profile=cls.profile)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+
+    def create_articles(self, count):
+        for i in range(count):
+            article = BlogArticle.objects.create(title=f"Article {i}", content="Content", blog=self.blog)
+            File.objects.create(file=f"files/{i}.jpg", blog_article=article)
+
+    def changelist_queries(self, url_name, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name), params or {})
+        self.assertEquals(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_count(self):
+        """
+        Проверка, что количество запросов в списках не зависит от количества строк
+        """
+        url_names = ("admin:app_blogs_blog_changelist", "admin:app_blogs_blogarticle_changelist",
+                     "admin:app_blogs_file_changelist")
+
+        self.create_articles(2)
+        queries = [self.changelist_queries(url_name) for url_name in url_names]
+
+        self.create_articles(10)
+        self.assertEquals([self.changelist_queries(url_name) for url_name in url_names], queries)
+
+    def test_input_filter(self):
+        """
+        Проверка, что фильтры с полем ввода фильтруют список и сохраняют остальные параметры
+        """
+        self.create_articles(3)
+        other = Blog.objects.create(title="Other", profile=self.profile)
+        BlogArticle.objects.create(title="Other article", content="Content", blog=other)
+
+        response = self.client.get(reverse("admin:app_blogs_blogarticle_changelist"),
+                                   {"blog__title": "oth", "o": "1"})
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(response.context["cl"].result_count, 1)
+        self.assertContains(response, '<input type="hidden" name="o" value="1"/>', html=True)
+
+        response = self.client.get(reverse("admin:app_blogs_blogarticle_changelist"),
+                                   {"blog__profile__user__username": "nobody"})
+        self.assertEquals(response.context["cl"].result_count, 0)
+
+    def test_move_article(self):
+        """
+        Проверка, что перенос статьи в другой блог через админку обновляет счетчики обоих блогов
+        """
+        self.create_articles(2)
+        other = Blog.objects.create(title="Other", profile=self.profile)
+        article = BlogArticle.objects.filter(blog=self.blog).first()
+
+        response = self.client.post(reverse("admin:app_blogs_blogarticle_change", args=(article.id,)), {
+            "title": article.title, "content": article.content, "blog": other.id,
+        })
+        self.assertEquals(response.status_code, 302)
+        self.assertEquals(Blog.objects.get(id=self.blog.id).articles_count(), 1)
+        self.assertEquals(Blog.objects.get(id=other.id).articles_count(), 1)
+
+    def test_delete_blog(self):
+        """
+        Проверка, что блог удаляется из админки через удаление пачками, а страница подтверждения
+        выводит количество статей и файлов без их перечисления
+        """
+        self.create_articles(3)
+        url = reverse("admin:app_blogs_blog_delete", args=(self.blog.id,))
+
+        response = self.client.get(url)
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(dict(response.context["model_count"]), {"блоги": 1, "статьи блога": 3, "файлы": 3})
+        self.assertNotContains(response, "Article 0")
+
+        response = self.client.post(url, {"post": "yes"})
+        self.assertEquals(response.status_code, 302)
+        self.assertFalse(Blog.objects.filter(id=self.blog.id).exists())
+        self.assertFalse(BlogArticle.objects.exists())
+        self.assertEquals(PendingMediaDeletion.objects.count(), 3)
+
+    def test_delete_selected_articles(self):
+        """
+        Проверка, что статьи из разных блогов удаляются действием списка через удаление пачками
+        """
+        self.create_articles(3)
+        other = Blog.objects.create(title="Other", profile=self.profile)
+        BlogArticle.objects.create(title="Other article", content="Content", blog=other)
+        kept = BlogArticle.objects.filter(blog=self.blog).first()
+
+        response = self.client.post(reverse("admin:app_blogs_blogarticle_changelist"), {
+            "action": "delete_selected", "post": "yes",
+            "_selected_action": list(BlogArticle.objects.exclude(id=kept.id).values_list("id", flat=True)),
+        })
+        self.assertEquals(response.status_code, 302)
+        self.assertEquals(list(BlogArticle.objects.values_list("id", flat=True)), [kept.id])
+        self.assertEquals(Blog.objects.get(id=self.blog.id).articles_count(), 1)
+        self.assertEquals(Blog.objects.get(id=other.id).articles_count(), 0)
+        self.assertEquals(PendingMediaDeletion.objects.count(), 2)
+
+    def test_blog_articles_link(self):
+        """
+        Проверка, что на странице блога вместо всех статей ссылка на отфильтрованный список статей
+        """
+        self.create_articles(3)
+        response = self.client.get(reverse("admin:app_blogs_blog_change", args=(self.blog.id,)))
+        self.assertEquals(response.status_code, 200)
+
+        url = reverse("admin:app_blogs_blogarticle_changelist") + f"?blog__id__exact={self.blog.id}"
+        self.assertContains(response, url)
+        self.assertNotContains(response, "Article 0")
+
+        response = self.client.get(url)
+        self.assertEquals(response.context["cl"].result_count, 3)
+
+    def test_estimated_count(self):
+        """
+        Проверка, что без фильтров количество строк берется из статистики БД, а с фильтрами считается точно
+        """
+        self.create_articles(5)
+        self.assertIsNone(estimate_count(BlogArticle))
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.assertEquals(estimate_count(BlogArticle), 5)
+
+        BlogArticle.objects.create(title="Article", content="Content", blog=self.blog)
+
+        paginator = EstimatedCountPaginator(BlogArticle.objects.order_by("id"), 2)
+        paginator.threshold = 0
+        self.assertEquals(paginator.count, 5)
+
+        paginator = EstimatedCountPaginator(BlogArticle.objects.filter(blog=self.blog).order_by("id"), 2)
+        paginator.threshold = 0
+        self.assertEquals(paginator.count, 6)
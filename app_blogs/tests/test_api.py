@@ -0,0 +1,147 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from app_auth.models import Avatar, UserProfile
+
+from ..models import Blog, BlogArticle, File
+
+from .utils import TestCaseMixin
+
+
+class ApiTest(TestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.blog = Blog.objects.create(title="Blog", description="Description", profile=cls.profile)
+        cls.articles = [
+            BlogArticle.objects.create(title=f"Article {i}", content=f"Content {i}", blog=cls.blog) for i in range(5)
+        ]
+        cls.file = File.objects.create(file="files/file.jpg", thumbnail="thumbnails/file.jpg",
+                                       blog_article=cls.articles[0])
+        Avatar.objects.create(avatar="files/avatar.jpg", profile=cls.profile)
+
+        cls.other_profile = UserProfile.objects.create(user=get_user_model().objects.create(username="other"))
+        cls.other_blog = Blog.objects.create(title="Other blog", profile=cls.other_profile)
+
+    def get_json(self, url_name, *args, status=200, **params):
+        response = self.client.get(reverse(url_name, args=args), params)
+        self.assertEquals(response.status_code, status)
+        self.assertEquals(response["Content-Type"], "application/json")
+        return json.loads(response.content)
+
+    def test_objects(self):
+        """
+        Проверка, что профиль, блог, статья и вложения выводятся по адресам, повторяющим адреса страниц
+        """
+        username = self.profile.user.username
+        article = self.articles[0]
+
+        data = self.get_json("api_user_profile", username)
+        self.assertEquals(data["username"], username)
+        self.assertEquals(data["avatar"]["url"], "/media/files/avatar.jpg")
+        self.assertNotIn("phone", data)
+        self.assertEquals(self.get_json("api_user_profile", "other")["avatar"], None)
+
+        data = self.get_json("api_blog", username, self.blog.id)
+        self.assertEquals((data["title"], data["articles_count"]), ("Blog", 5))
+        self.assertTrue(data["url"].endswith(reverse("blog", args=(username, self.blog.id))))
+
+        data = self.get_json("api_blog_article", username, self.blog.id, article.id)
+        self.assertEquals((data["content"], data["blog"]["title"], data["author"]), ("Content 0", "Blog", username))
+
+        data = self.get_json("api_blog_article_files", username, self.blog.id, article.id)
+        self.assertEquals(data["results"], [{
+            "id": self.file.id, "name": "file.jpg", "url": "/media/files/file.jpg",
+            "thumbnail": "/media/thumbnails/file.jpg", "thumbnail_webp": None,
+        }])
+        self.assertEquals(self.get_json("api_blog_article_files", username, self.blog.id, self.articles[1].id),
+                          {"results": []})
+
+    def test_not_found(self):
+        """
+        Проверка, что для чужих и несуществующих объектов возвращается 404
+        """
+        username = self.profile.user.username
+        self.get_json("api_user_profile", "nobody", status=404)
+        self.get_json("api_user_profile_blogs", "nobody", status=404)
+        self.get_json("api_blog", "other", self.blog.id, status=404)
+        self.get_json("api_blog_articles", "other", self.blog.id, status=404)
+        self.get_json("api_blog_article", username, self.other_blog.id, self.articles[0].id, status=404)
+        self.get_json("api_blog_article_files", "other", self.blog.id, self.articles[0].id, status=404)
+
+        self.assertEquals(self.get_json("api_blog_articles", "other", self.other_blog.id)["results"], [])
+
+    @override_settings(API_PAGINATE_BY=2)
+    def test_pagination(self):
+        """
+        Проверка, что списки выводятся по курсору, а неверный курсор возвращает ошибку
+        """
+        titles = []
+        url = reverse("api_blog_articles", args=(self.profile.user.username, self.blog.id))
+        while url:
+            data = json.loads(self.client.get(url).content)
+            titles += [article["title"] for article in data["results"]]
+            url = data["next"]
+        self.assertEquals(titles, [f"Article {i}" for i in reversed(range(5))])
+
+        data = self.get_json("api_articles", older="broken", status=400)
+        self.assertIn("error", data)
+
+    def test_fields(self):
+        """
+        Проверка, что выводятся только запрошенные поля, а ненужные колонки не загружаются
+        """
+        with self.assertNumQueries(1) as queries:
+            data = self.get_json("api_articles", fields="id,title")
+        self.assertEquals(set(data["results"][0]), {"id", "title"})
+        self.assertNotIn('"content"', queries.captured_queries[0]["sql"])
+
+        with self.assertNumQueries(1):
+            data = self.get_json("api_articles", fields="content,blog,url")
+        self.assertEquals(data["results"][0]["content"], "Content 4")
+
+        data = self.get_json("api_articles", fields="title,password", status=400)
+        self.assertIn("password", data["error"])
+
+    def test_single_query(self):
+        """
+        Проверка, что количество запросов не зависит от количества объектов на странице
+        """
+        with self.assertNumQueries(1):
+            self.get_json("api_articles")
+        with self.assertNumQueries(1):
+            self.get_json("api_user_profile_blogs", self.profile.user.username)
+        with self.assertNumQueries(1):
+            self.get_json("api_user_profile", self.profile.user.username)
+        with self.assertNumQueries(1):
+            self.get_json("api_user_profile", self.profile.user.username, fields="username")
+
+    def test_etag(self):
+        """
+        Проверка, что клиент с актуальным ETag получает 304 (для объекта - одним запросом даты изменения,
+        для списка - без запросов), изменения других объектов ETag не меняют, а после изменения - новые данные
+        """
+        list_url = reverse("api_articles")
+        list_etag = self.client.get(list_url)["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEquals(self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag).status_code, 304)
+
+        url = reverse("api_blog_article", args=(self.profile.user.username, self.blog.id, self.articles[0].id))
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            self.assertEquals(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.commit_callbacks():
+            self.articles[1].save()
+        self.assertEquals(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.articles[0].content = "Changed"
+        with self.commit_callbacks():
+            self.articles[0].save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEquals(json.loads(response.content)["content"], "Changed")
@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from app_auth.models import Avatar, UserProfile
+
+from ..benchmarks import compare_results, generate_data, get_scenarios, percentile, run_benchmarks
+from ..models import Blog, BlogArticle, File
+from ..search import SearchResults
+
+
+class BenchmarksTest(TestCase):
+    def test_generate_data(self):
+        """
+        Проверка, что генератор создает заданное количество объектов с верными счетчиками
+        """
+        generate_data(users=2, blogs=2, articles=3, files=2, batch_size=4)
+
+        self.assertEquals(get_user_model().objects.count(), 2)
+        self.assertEquals((UserProfile.objects.count(), Avatar.objects.count()), (2, 2))
+        self.assertEquals((Blog.objects.count(), BlogArticle.objects.count(), File.objects.count()), (4, 12, 24))
+        blog = Blog.objects.first()
+        self.assertEquals(blog.articles_counter, BlogArticle.objects.filter(blog=blog).count())
+        article = BlogArticle.objects.first()
+        self.assertEquals(article.files_counter, 2)
+        self.assertEquals(article.excerpt, article.content[:BlogArticle.EXCERPT_LENGTH])
+        self.assertGreater(SearchResults(article.title.split()[0]).count(), 0)
+
+    def test_run_benchmarks(self):
+        """
+        Проверка, что все сценарии выполняются и для каждого выводится время, количество запросов и память
+        """
+        generate_data(users=2, blogs=1, articles=3, files=1)
+        results = run_benchmarks(get_scenarios(import_rows_count=5), repeat=2, warmup=1)
+
+        self.assertEquals(set(results), {
+            "home", "home_anonymous", "blog", "blog_article", "user_profile",
+            "admin_blogs", "admin_articles", "admin_files", "admin_profiles", "csv_import",
+        })
+        for result in results.values():
+            self.assertLessEqual(result["min_ms"], result["p50_ms"])
+            self.assertLessEqual(result["p50_ms"], result["max_ms"])
+            self.assertGreater(result["peak_memory_kb"], 0)
+        self.assertGreater(results["blog"]["queries"], 0)
+
+        rows = compare_results({"blog": dict(results["blog"], queries=1)}, results)
+        self.assertEquals([(row[0], row[4]) for row in rows], [("blog", 1)])
+
+    def test_percentile(self):
+        """
+        Проверка, что перцентили считаются с интерполяцией между соседними значениями
+        """
+        self.assertEquals(percentile([3, 1, 2, 4], 50), 2.5)
+        self.assertAlmostEqual(percentile([1, 2, 3, 4, 5], 90), 4.6)
+        self.assertEquals(percentile([7], 99), 7)
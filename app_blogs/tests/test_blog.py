@@ -1,7 +1,21 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.files import File as DjangoFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 
-from ..models import Blog, BlogArticle
+from ..jobs import claim_job
+from ..models import Blog, BlogArticle, File, ArticlesImportJob, PendingMediaDeletion
+from ..search import SearchResults
 
 from .utils import TestCaseMixin
 
@@ -65,6 +79,30 @@ class BlogTest(BlogTestMixin):
         response = self.page_test()
         self.assertEquals(len(response.context[self.articles_context_name]), self.blog.articles_count())
 
+    def test_queries_count(self):
+        """
+        Проверка, что количество запросов не зависит от количества статей в блоге,
+        а блог запрашивается один раз за запрос
+        """
+        for count in (1, 10):
+            with self.commit_callbacks():
+                for i in range(count):
+                    BlogArticle.objects.create(title=f"Article {i}", content=f"Article {i} content", blog=self.blog)
+
+            with self.assertNumQueries(3):
+                self.page_test()
+
+    def test_edit_page_queries_count(self):
+        """
+        Проверка, что на странице редактирования блог запрашивается один раз
+        """
+        self.login_test()
+        self.client.get(reverse("edit_blog", args=(self.profile.user.username, self.blog.id)))
+
+        # сессия, пользователь и блог
+        with self.assertNumQueries(3):
+            self.client.get(reverse("edit_blog", args=(self.profile.user.username, self.blog.id)))
+
     def test_has_not_access_on_page(self):
         """
         Проверка, что для неавторизованного пользователя ссылки на удаление и редактирование недоступны
@@ -319,3 +357,457 @@ class DeleteBlogTest(BlogTestMixin):
 
         self.test_page()
         self.assertEquals(BlogArticle.objects.filter(blog=self.blog).count(), 0)
+
+    @override_settings(BLOG_DELETE_BATCH_SIZE=3)
+    def test_chunked_delete(self):
+        """
+        Проверка, что блог удаляется пачками вместе с файлами, импортами и поисковым индексом,
+        а файлы удаляются из хранилища отдельной командой
+        """
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            blog = Blog.objects.create(title="Deleted", profile=self.profile)
+            for i in range(7):
+                article = BlogArticle.objects.create(title=f"Removed {i}", content="Content", blog=blog)
+                File.objects.create(file=SimpleUploadedFile(f"{i}.txt", b"data"), blog_article=article)
+            ArticlesImportJob.objects.create(blog=blog, file=SimpleUploadedFile("import.csv", b"Title;Content"))
+            names = list(File.objects.filter(blog_article__blog=blog).values_list("file", flat=True))
+            kept = BlogArticle.objects.create(title="Removed kept", content="Content", blog=self.blog)
+
+            self.login_test()
+            with self.assertNumQueries(37):
+                self.client.get(reverse(self.tested_url_name, args=(self.profile.user.username, blog.id)))
+
+            self.assertFalse(Blog.objects.filter(id=blog.id).exists())
+            self.assertFalse(BlogArticle.objects.filter(blog_id=blog.id).exists())
+            self.assertFalse(File.objects.filter(blog_article__blog_id=blog.id).exists())
+            self.assertFalse(ArticlesImportJob.objects.filter(blog_id=blog.id).exists())
+            self.assertEquals([r.article.id for r in SearchResults("removed")[0:20]], [kept.id])
+
+            self.assertEquals(PendingMediaDeletion.objects.count(), 8)
+            self.assertTrue(all(default_storage.exists(name) for name in names))
+
+            call_command("delete_pending_media", batch_size=5, stdout=open(os.devnull, "w"))
+            self.assertFalse(any(default_storage.exists(name) for name in names))
+            self.assertFalse(PendingMediaDeletion.objects.exists())
+
+
+class BlogCountersTest(BlogTestMixin):
+    def create_articles(self, count, blog=None):
+        return [
+            BlogArticle.objects.create(title=f"Article {i}", content=f"Article {i} content", blog=blog or self.blog)
+            for i in range(count)
+        ]
+
+    def create_files(self, article, count):
+        for _ in range(count):
+            File.objects.create(
+                file=DjangoFile(
+                    open(os.path.join(os.path.dirname(__file__), "me-30.jpg"), mode="rb"),
+                    "me-30.jpg"
+                ),
+                blog_article=article
+            )
+
+    def test_articles_counter(self):
+        """
+        Проверка, что счетчик статей блога обновляется при создании и удалении статей
+        """
+        articles = self.create_articles(5)
+        self.blog.refresh_from_db()
+        self.assertEquals(self.blog.articles_count(), 5)
+
+        articles[0].delete()
+        BlogArticle.objects.filter(id__in=[a.id for a in articles[1:3]]).delete()
+        self.blog.refresh_from_db()
+        self.assertEquals(self.blog.articles_count(), 2)
+
+    def test_files_counter(self):
+        """
+        Проверка, что счетчик файлов статьи обновляется при добавлении и удалении файлов
+        """
+        article, = self.create_articles(1)
+        self.create_files(article, 3)
+        article.refresh_from_db()
+        self.assertEquals(article.files_count(), 3)
+
+        File.objects.filter(blog_article=article).first().delete()
+        article.refresh_from_db()
+        self.assertEquals(article.files_count(), 2)
+
+    def test_move_article(self):
+        """
+        Проверка, что при переносе статьи в другой блог счетчики статей меняются у обоих блогов
+        """
+        other = Blog.objects.create(title="Other blog", profile=self.profile)
+        article, _ = self.create_articles(2)
+
+        article.blog = other
+        article.save()
+        moved = BlogArticle.objects.get(id=article.id)
+        moved.title = "Not moved"
+        moved.save()
+        self.blog.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEquals((self.blog.articles_count(), other.articles_count()), (1, 1))
+
+        moved.blog = self.blog
+        moved.save(update_fields=["blog"])
+        self.blog.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEquals((self.blog.articles_count(), other.articles_count()), (2, 0))
+
+    def test_move_file(self):
+        """
+        Проверка, что при переносе файла в другую статью счетчики файлов меняются у обеих статей
+        """
+        article, other = self.create_articles(2)
+        self.create_files(article, 2)
+
+        file = File.objects.filter(blog_article=article).first()
+        file.blog_article = other
+        file.save()
+        article.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEquals((article.files_count(), other.files_count()), (1, 1))
+
+    def test_cascade_delete(self):
+        """
+        Проверка, что каскадное удаление статей вместе с файлами не ломает счетчики
+        """
+        blog = Blog.objects.create(title="Blog to delete", profile=self.profile)
+        article, _ = self.create_articles(2, blog=blog)
+        self.create_files(article, 2)
+
+        blog.delete()
+        self.assertFalse(BlogArticle.objects.filter(blog_id=article.blog_id).exists())
+        self.assertFalse(File.objects.filter(blog_article_id=article.id).exists())
+
+    def test_recount_command(self):
+        """
+        Проверка, что команда пересчета восстанавливает рассинхронизированные счетчики
+        """
+        article, _ = self.create_articles(2)
+        self.create_files(article, 3)
+        Blog.objects.update(articles_counter=100)
+        BlogArticle.objects.update(files_counter=100)
+        empty_blog = Blog.objects.create(title="Empty", profile=self.profile, articles_counter=7)
+
+        call_command("recount_blog_counters", stdout=open(os.devnull, "w"))
+
+        self.blog.refresh_from_db()
+        article.refresh_from_db()
+        empty_blog.refresh_from_db()
+        self.assertEquals(self.blog.articles_count(), 2)
+        self.assertEquals(article.files_count(), 3)
+        self.assertEquals(BlogArticle.objects.exclude(id=article.id).get().files_count(), 0)
+        self.assertEquals(empty_blog.articles_count(), 0)
+
+
+class ImportBlogArticlesTest(BlogTestMixin):
+    tested_template = "blog-imports.html"
+    tested_url_name = "blog_imports"
+
+    def upload(self, data, encoding="utf-8"):
+        return self.client.post(
+            reverse("blog", args=(self.profile.user.username, self.blog.id)),
+            {"file": SimpleUploadedFile("articles.csv", data.encode(encoding), content_type="text/csv")}
+        )
+
+    def process_jobs(self, **options):
+        call_command("process_import_jobs", once=True, stdout=open(os.devnull, "w"), **options)
+
+    def import_test(self, data, encoding="utf-8"):
+        self.login_test()
+
+        response = self.upload(data, encoding)
+        job = ArticlesImportJob.objects.latest("id")
+        self.assertEquals(response.status_code, 302)
+        self.assertEquals(response.url, reverse(self.tested_url_name, args=(self.profile.user.username, self.blog.id)))
+        self.assertEquals(job.status, ArticlesImportJob.STATUS_PENDING)
+
+        self.process_jobs()
+        job.refresh_from_db()
+        return job
+
+    def test_page(self):
+        self.login_test()
+        self.page_test()
+
+    def test_forbidden_page(self):
+        """
+        Проверка, что чужие импорты не видны
+        """
+        response = self.client.get(reverse(self.tested_url_name, args=(self.profile.user.username, self.blog.id)))
+        self.assertEquals(response.status_code, 302)
+        self.assertTrue(response.url.startswith("/login"))
+
+    def test_not_access(self):
+        """
+        Проверка, что неавторизованные пользователи не могут загружать статьи
+        """
+        response = self.client.post(reverse("blog", args=(self.profile.user.username, self.blog.id)))
+        self.assertEquals(response.status_code, 302)
+        self.assertTrue(response.url.startswith("/login"))
+
+    def test_forbidden(self):
+        """
+        Проверка, что нельзя загрузить статьи в чужой блог
+        """
+        user = get_user_model().objects.create(username="some_user")
+        user.set_password(self.user_raw_password)
+        user.save()
+        self.client.login(username=user.username, password=self.user_raw_password)
+
+        response = self.upload("Title;Content\n")
+        self.assertEquals(response.status_code, 403)
+        self.assertFalse(ArticlesImportJob.objects.exists())
+
+    @override_settings(BLOG_ARTICLES_IMPORT_BATCH_SIZE=2)
+    def test_import(self):
+        """
+        Проверка, что статьи загружаются пачками, включая многострочные значения в кавычках
+        """
+        data = "First;First content\r\n" \
+               "Second;\"Multiline\ncontent; with \"\"quotes\"\"\"\n" \
+               "\n" \
+               "Third;Third content"
+        job = self.import_test(data)
+
+        self.assertEquals(job.status, ArticlesImportJob.STATUS_DONE)
+        self.assertEquals((job.imported, job.failed, job.progress()), (3, 0, 100))
+        self.assertFalse(job.file)
+
+        articles = BlogArticle.objects.filter(blog=self.blog).order_by("id")
+        self.assertEquals([a.title for a in articles], ["First", "Second", "Third"])
+        self.assertEquals(articles[1].content, 'Multiline\ncontent; with "quotes"')
+        self.assertEquals(articles[1].excerpt, 'Multiline\ncontent; with "quotes"')
+
+        self.blog.refresh_from_db()
+        self.assertEquals(self.blog.articles_count(), 3)
+
+        response = self.page_test()
+        self.assertEquals(list(response.context["jobs"]), [job])
+
+    def test_import_windows_1251(self):
+        """
+        Проверка, что файлы в кодировке windows-1251 тоже загружаются
+        """
+        self.import_test("Заголовок;Содержимое\n", encoding="windows-1251")
+
+        article = BlogArticle.objects.get(blog=self.blog)
+        self.assertEquals(article.title, "Заголовок")
+        self.assertEquals(article.content, "Содержимое")
+
+    def test_import_errors(self):
+        """
+        Проверка, что ошибочные строки не загружаются, а в отчете указаны их номера
+        """
+        data = "Good;Content\n" \
+               "only title\n" \
+               ";no title\n" \
+               "{long};Content\n" \
+               "Good again;Content\n".format(long="x" * 201)
+        job = self.import_test(data)
+
+        self.assertEquals(BlogArticle.objects.filter(blog=self.blog).count(), 2)
+        self.assertEquals((job.imported, job.failed), (2, 3))
+        self.assertEquals([line for line, error in job.error_list()], [2, 3, 4])
+
+    def test_claim(self):
+        """
+        Проверка, что задачу забирает только один обработчик, а зависшую задачу можно забрать повторно
+        """
+        job = ArticlesImportJob.objects.create(blog=self.blog)
+
+        self.assertEquals(claim_job("first"), job)
+        self.assertIsNone(claim_job("second"))
+        self.assertIsNone(claim_job("second", stale_timeout=60))
+
+        ArticlesImportJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(seconds=120))
+        claimed = claim_job("second", stale_timeout=60)
+        self.assertEquals(claimed, job)
+        self.assertEquals(claimed.worker, "second")
+
+    @override_settings(BLOG_ARTICLES_IMPORT_BATCH_SIZE=1)
+    def test_resume(self):
+        """
+        Проверка, что зависшая задача продолжается со строки, следующей за последней сохраненной
+        """
+        job = ArticlesImportJob.objects.create(
+            blog=self.blog,
+            file=SimpleUploadedFile("articles.csv", "First;Content\nSecond;Content\nThird;Content\n".encode()),
+            status=ArticlesImportJob.STATUS_RUNNING,
+            worker="dead",
+            line=2,
+            imported=2
+        )
+        ArticlesImportJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.process_jobs(stale_timeout=60)
+        job.refresh_from_db()
+
+        self.assertEquals(job.status, ArticlesImportJob.STATUS_DONE)
+        self.assertEquals(job.imported, 3)
+        self.assertEquals(list(BlogArticle.objects.filter(blog=self.blog).values_list("title", flat=True)), ["Third"])
+
+
+class ExportBlogArticlesTest(BlogTestMixin):
+    tested_url_name = "export_blog_articles"
+
+    def export(self, url_name=None, args=None, **params):
+        url = reverse(url_name or self.tested_url_name, args=args or (self.profile.user.username, self.blog.id))
+        return self.client.get(url, params)
+
+    def test_forbidden(self):
+        """
+        Проверка, что выгрузить статьи может только владелец
+        """
+        response = self.export()
+        self.assertEquals(response.status_code, 302)
+        self.assertTrue(response.url.startswith("/login"))
+
+        self.client.force_login(get_user_model().objects.create(username="some_user"))
+        self.assertEquals(self.export().status_code, 403)
+        self.assertEquals(self.export("export_user_articles", (self.profile.user.username,)).status_code, 403)
+
+        self.login_test()
+        self.assertEquals(self.export(format="xml").status_code, 404)
+
+    @override_settings(BLOG_ARTICLES_EXPORT_CHUNK_SIZE=2)
+    def test_csv_round_trip(self):
+        """
+        Проверка, что выгруженный CSV загружается обратно тем же импортом
+        """
+        contents = ["First content", "Multiline\ncontent; with \"quotes\"", "Третья статья", "", "Last"]
+        for i, content in enumerate(contents):
+            BlogArticle.objects.create(title=f"Article {i}", content=content, blog=self.blog)
+
+        self.login_test()
+        response = self.export()
+        self.assertTrue(response.streaming)
+        self.assertEquals(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn("attachment", response["Content-Disposition"])
+        data = b"".join(response.streaming_content)
+
+        copy = Blog.objects.create(title="Copy", profile=self.profile)
+        self.client.post(
+            reverse("blog", args=(self.profile.user.username, copy.id)),
+            {"file": SimpleUploadedFile("articles.csv", data, content_type="text/csv")}
+        )
+        call_command("process_import_jobs", once=True, stdout=open(os.devnull, "w"))
+
+        self.assertEquals(
+            list(BlogArticle.objects.filter(blog=copy).order_by("id").values_list("title", "content")),
+            [(f"Article {i}", content) for i, content in enumerate(contents)]
+        )
+
+    def test_jsonl(self):
+        """
+        Проверка выгрузки в JSONL всех статей пользователя
+        """
+        other_blog = Blog.objects.create(title="Other", profile=self.profile)
+        first = BlogArticle.objects.create(title="First", content="Первая\nстатья", blog=self.blog)
+        second = BlogArticle.objects.create(title="Second", content="Content", blog=other_blog)
+
+        self.login_test()
+        response = self.export("export_user_articles", (self.profile.user.username,), format="jsonl")
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+
+        self.assertEquals([(r["id"], r["blog"], r["content"]) for r in records], [
+            (first.id, self.blog.id, "Первая\nстатья"), (second.id, other_blog.id, "Content"),
+        ])
+
+
+class ArticlesCommandsTest(BlogTestMixin):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write_file(self, name, data, encoding="utf-8"):
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as file:
+            file.write(data.encode(encoding))
+        return path
+
+    def import_files(self, *paths, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_articles", self.profile.user.username, str(self.blog.id), *paths,
+                     stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def titles(self):
+        return list(BlogArticle.objects.filter(blog=self.blog).order_by("id").values_list("title", flat=True))
+
+    def test_import(self):
+        """
+        Проверка, что статьи загружаются из нескольких файлов по тем же правилам, что и через сайт
+        """
+        first = self.write_file("first.csv", "First;Content\r\nSecond;\"Multiline\ncontent\"\r\n;No title\r\n")
+        second = self.write_file("second.csv", "Третья;Содержимое\r\n", encoding="windows-1251")
+
+        stdout, stderr = self.import_files(first, second, batch_size=1)
+        self.assertEquals(self.titles(), ["First", "Second", "Третья"])
+        self.assertIn("строк/с", stdout)
+        self.assertIn(f"{first}:4: ", stderr)
+
+        self.blog.refresh_from_db()
+        self.assertEquals(self.blog.articles_counter, 3)
+        self.assertEquals(len(SearchResults("третья")[0:10]), 1)
+
+    def test_resume(self):
+        """
+        Проверка, что повторный запуск продолжает файл с сохраненной отметки, а загруженный файл пропускает
+        """
+        path = self.write_file("articles.csv", "First;Content\r\nSecond;Content\r\nThird;Content\r\n")
+        with open(f"{path}.checkpoint", "w") as file:
+            json.dump({"line": 2, "imported": 2, "failed": 0, "done": False}, file)
+
+        self.import_files(path)
+        self.assertEquals(self.titles(), ["Third"])
+
+        stdout, stderr = self.import_files(path)
+        self.assertIn("пропущен", stdout)
+        self.assertEquals(self.titles(), ["Third"])
+
+        self.import_files(path, restart=True)
+        self.assertEquals(self.titles(), ["Third", "First", "Second", "Third"])
+
+    def test_processes_on_sqlite(self):
+        """
+        Проверка, что на SQLite файлы загружаются в одном процессе даже с --processes
+        """
+        paths = [self.write_file(f"articles-{i}.csv", f"Article {i};Content\r\n") for i in range(2)]
+
+        stdout, stderr = self.import_files(*paths, processes=2)
+        self.assertIn("SQLite", stderr)
+        self.assertEquals(self.titles(), ["Article 0", "Article 1"])
+        self.blog.refresh_from_db()
+        self.assertEquals(self.blog.articles_count(), 2)
+
+    def test_wrong_blog(self):
+        """
+        Проверка, что нельзя загрузить статьи в блог другого пользователя
+        """
+        path = self.write_file("articles.csv", "First;Content\r\n")
+        with self.assertRaises(CommandError):
+            call_command("import_articles", "other", str(self.blog.id), path)
+
+    def test_export(self):
+        """
+        Проверка, что выгруженный командой файл загружается обратно
+        """
+        for i in range(3):
+            BlogArticle.objects.create(title=f"Article {i}", content=f"Content;\n{i}", blog=self.blog)
+
+        path = os.path.join(self.directory, "export.csv")
+        call_command("export_articles", self.profile.user.username, blog=self.blog.id, output=path, stderr=StringIO())
+
+        copy = Blog.objects.create(title="Copy", profile=self.profile)
+        call_command("import_articles", self.profile.user.username, str(copy.id), path, stdout=StringIO())
+        self.assertEquals(
+            list(BlogArticle.objects.filter(blog=copy).order_by("id").values_list("title", "content")),
+            [(f"Article {i}", f"Content;\n{i}") for i in range(3)]
+        )
@@ -2,7 +2,9 @@ import os
 
 from django.core.files import File as DjangoFile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
+from django.test import Client, override_settings
 from django.urls import reverse
 
 from ..models import Blog, BlogArticle, File
@@ -44,6 +46,13 @@ class BlogArticleTest(BlogArticleTestMixin):
     def test_page(self):
         self.page_test()
 
+    def test_queries_count(self):
+        """
+        Проверка, что статья запрашивается один раз за запрос (второй запрос - вложения)
+        """
+        with self.assertNumQueries(2):
+            self.page_test()
+
     def test_has_not_access_on_page(self):
         """
         Проверка, что для неавторизованного пользователя ссылки на удаление и редактирование недоступны
@@ -216,6 +225,55 @@ class CreateBlogArticleTest(TestCaseMixin):
         self.assertEquals(File.objects.filter(blog_article=blog_article).count(), files_count)
 
 
+class ThumbnailsTest(BlogArticleTestMixin):
+    tested_template = "blog-article.html"
+    tested_url_name = "blog_article"
+
+    def create_file(self, name="me-30.jpg"):
+        return File.objects.create(
+            file=DjangoFile(open(os.path.join(os.path.dirname(__file__), "me-30.jpg"), mode="rb"), name),
+            blog_article=self.blog_article
+        )
+
+    def test_upload_creates_thumbnails(self):
+        """
+        Проверка, что при загрузке вложений создаются миниатюры, а на странице выводятся они со ссылкой на оригинал
+        """
+        self.login_test()
+
+        image = open(os.path.join(os.path.dirname(__file__), "me-30.jpg"), mode="rb").read()
+        self.client.post(
+            reverse("edit_blog_article", args=(self.profile.user.username, self.blog_article.blog.id, self.blog_article.id)),
+            {
+                "title": self.blog_article.title,
+                "content": self.blog_article.content,
+                "attachments": [SimpleUploadedFile("me-30.jpg", image, content_type="image/jpeg")],
+            }
+        )
+
+        image_file = File.objects.get(blog_article=self.blog_article)
+        self.assertTrue(image_file.thumbnail.name.endswith(".jpg"))
+        self.assertTrue(image_file.thumbnail_webp.name.endswith(".webp"))
+        self.assertLess(image_file.thumbnail.size, image_file.file.size)
+
+        content = self.page_test().content.decode("utf-8")
+        self.assertIn(r'<a href="{url}">'.format(url=image_file.file.url), content)
+        self.assertIn(r'<img src="{url}"'.format(url=image_file.thumbnail.url), content)
+
+    def test_backfill_command(self):
+        """
+        Проверка, что команда создает миниатюры для уже загруженных файлов
+        """
+        file = self.create_file()
+        self.assertFalse(file.thumbnail)
+
+        call_command("generate_thumbnails", stdout=open(os.devnull, "w"))
+
+        file.refresh_from_db()
+        self.assertTrue(file.thumbnail)
+        self.assertTrue(file.thumbnail_webp)
+
+
 class EditBlogArticleTest(BlogArticleTestMixin):
     tested_template = "edit-blog-article.html"
     tested_url_name = "edit_blog_article"
@@ -311,6 +369,111 @@ class EditBlogArticleTest(BlogArticleTestMixin):
         self.assertEquals(File.objects.filter(blog_article=self.blog_article).count(), files_count)
 
 
+class ExcerptTest(BlogArticleTestMixin):
+    def test_excerpt_on_save(self):
+        """
+        Проверка, что начало записи сохраняется при создании и изменении статьи
+        """
+        article = BlogArticle.objects.create(title="Long", content="a" * 500, blog=self.blog_article.blog)
+        self.assertEquals(article.short_content(), "a" * 100)
+
+        article.content = "short"
+        article.save(update_fields=["content"])
+        article.refresh_from_db()
+        self.assertEquals(article.excerpt, "short")
+
+    def test_listing_defers_content(self):
+        """
+        Проверка, что в списках статей текст статьи не загружается
+        """
+        article = BlogArticle.objects.listing().get(id=self.blog_article.id)
+        self.assertIn("content", article.get_deferred_fields())
+        with self.assertNumQueries(0):
+            self.assertEquals(article.short_content(), "Article content")
+
+    def test_backfill_command(self):
+        """
+        Проверка, что команда заполняет начало записи у старых статей
+        """
+        BlogArticle.objects.update(excerpt="")
+        call_command("backfill_excerpts", batch_size=1, stdout=open(os.devnull, "w"))
+        self.blog_article.refresh_from_db()
+        self.assertEquals(self.blog_article.excerpt, "Article content")
+
+
+class UploadLimitsTest(BlogArticleTestMixin):
+    tested_template = "edit-blog-article.html"
+    tested_url_name = "edit_blog_article"
+
+    def upload(self, *attachments):
+        self.login_test()
+        return self.client.post(
+            reverse(self.tested_url_name, args=(self.profile.user.username, self.blog_article.blog.id, self.blog_article.id)),
+            {"title": "Changed", "content": self.blog_article.content, "attachments": list(attachments)}
+        )
+
+    def image(self, name="me-30.jpg"):
+        return SimpleUploadedFile(
+            name, open(os.path.join(os.path.dirname(__file__), "me-30.jpg"), mode="rb").read(), content_type="image/*"
+        )
+
+    def assertRejected(self, response):
+        self.assertEquals(response.status_code, 200)
+        self.assertTrue(response.context["form"].errors["attachments"])
+        self.assertFalse(File.objects.filter(blog_article=self.blog_article).exists())
+        self.blog_article.refresh_from_db()
+        self.assertEquals(self.blog_article.title, "Article")
+
+    def test_rejects_not_image(self):
+        """
+        Проверка, что тип файла определяется по содержимому, а не по присланному типу и расширению
+        """
+        response = self.upload(SimpleUploadedFile("fake.jpg", b"<script>alert(1)</script>", content_type="image/jpeg"))
+        self.assertRejected(response)
+
+    @override_settings(UPLOAD_MAX_FILE_SIZE=1024)
+    def test_rejects_large_file(self):
+        """
+        Проверка, что файл больше UPLOAD_MAX_FILE_SIZE отклоняется
+        """
+        self.assertRejected(self.upload(self.image()))
+
+    def test_rejects_large_request(self):
+        """
+        Проверка, что отклоняются файлы, общий размер которых больше UPLOAD_MAX_REQUEST_SIZE
+        """
+        image = self.image()
+        with self.settings(UPLOAD_MAX_REQUEST_SIZE=image.size * 2 - 1):
+            self.assertRejected(self.upload(image, self.image()))
+
+    @override_settings(UPLOAD_MAX_FILES=2)
+    def test_rejects_too_many_files(self):
+        """
+        Проверка, что нельзя загрузить больше UPLOAD_MAX_FILES файлов за раз
+        """
+        self.assertRejected(self.upload(self.image(), self.image(), self.image()))
+
+    def test_csrf_protected(self):
+        """
+        Проверка, что CSRF-токен по-прежнему проверяется
+        """
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.profile.user)
+        response = client.post(
+            reverse(self.tested_url_name, args=(self.profile.user.username, self.blog_article.blog.id, self.blog_article.id)),
+            {"title": "Changed", "content": self.blog_article.content, "attachments": [self.image()]}
+        )
+        self.assertEquals(response.status_code, 403)
+
+    def test_accepts_image(self):
+        """
+        Проверка, что изображение в пределах ограничений загружается
+        """
+        response = self.upload(self.image())
+        self.assertEquals(response.status_code, 302)
+        self.assertEquals(File.objects.filter(blog_article=self.blog_article).count(), 1)
+
+
 class DeleteBlogArticleTest(BlogArticleTestMixin):
     tested_url_name = "delete_blog_article"
 
@@ -0,0 +1,133 @@
+import os
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.files import File as DjangoFile
+from django.urls import reverse
+from django.utils import timezone
+
+from app_auth.models import UserProfile
+
+from ..cache import invalidate_pages
+from ..models import Blog, BlogArticle, File
+
+from .utils import BlogPagesTestMixin
+
+
+class ConditionalGetTest(BlogPagesTestMixin):
+    def not_modified_test(self, url, response):
+        validators = [{"HTTP_IF_NONE_MATCH": response["ETag"]}]
+        if response.has_header("Last-Modified"):
+            validators.append({"HTTP_IF_MODIFIED_SINCE": response["Last-Modified"]})
+        for headers in validators:
+            not_modified = self.client.get(url, **headers)
+            self.assertEquals(not_modified.status_code, 304, url)
+            self.assertEquals(not_modified.content, b"")
+
+    def test_validators(self):
+        """
+        Проверка, что страницы отдают ETag и Last-Modified (главная - только ETag)
+        и отвечают 304 на условные запросы
+        """
+        for url in self.urls():
+            response = self.client.get(url)
+            self.assertEquals(response.status_code, 200)
+            self.assertTrue(response.has_header("ETag"), url)
+            self.assertEquals(response.has_header("Last-Modified"), url != reverse("home"), url)
+
+            self.not_modified_test(url, response)
+
+    def test_authenticated(self):
+        """
+        Проверка, что у авторизованного пользователя свой ETag, т.к. ему выводятся ссылки редактирования,
+        и что 304 отдается без кэша страниц
+        """
+        url = reverse("blog", args=(self.profile.user.username, self.blog.id))
+        anonymous = self.client.get(url)
+
+        self.login_test()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=anonymous["ETag"])
+        self.assertEquals(response.status_code, 200)
+        self.not_modified_test(url, response)
+
+    def modified_test(self, change):
+        responses = [(url, self.client.get(url)) for url in self.urls()]
+        with self.commit_callbacks():
+            change()
+        for url, response in responses:
+            modified = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEquals(modified.status_code, 200, url)
+
+    def test_article_edit(self):
+        def change():
+            self.blog_article.content = "New content"
+            self.blog_article.save()
+
+        self.modified_test(change)
+
+    def test_article_add_and_delete(self):
+        self.modified_test(lambda: BlogArticle.objects.create(title="New", content="New", blog=self.blog))
+        self.modified_test(lambda: BlogArticle.objects.filter(title="New").delete())
+
+    def last_modified_test(self, url, change):
+        """
+        Даты изменения сдвигаются в прошлое, чтобы новое значение Last-Modified отличалось с точностью до секунды
+        """
+        past = timezone.now() - timedelta(days=1)
+        Blog.objects.update(edit_at=past)
+        BlogArticle.objects.update(edit_at=past)
+        invalidate_pages()
+
+        last_modified = self.client.get(url)["Last-Modified"]
+        with self.commit_callbacks():
+            change()
+        self.assertEquals(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200)
+
+    def test_article_last_modified(self):
+        """
+        Проверка, что Last-Modified страницы статьи меняется при добавлении вложения и переименовании блога
+        """
+        url = reverse("blog_article", args=(self.profile.user.username, self.blog.id, self.blog_article.id))
+
+        self.last_modified_test(url, lambda: File.objects.create(file="files/me-30.jpg", blog_article=self.blog_article))
+        self.last_modified_test(url, File.objects.get().delete)
+
+        def rename():
+            self.blog.title = "Renamed"
+            self.blog.save()
+
+        self.last_modified_test(url, rename)
+
+    def test_home_blog_delete(self):
+        """
+        Проверка, что главная страница считается измененной после удаления блога
+        """
+        other = Blog.objects.create(title="Other", profile=self.profile)
+        BlogArticle.objects.create(title="Other article", content="Other content", blog=other)
+
+        url = reverse("home")
+        etag = self.client.get(url)["ETag"]
+        with self.commit_callbacks():
+            other.delete()
+        self.assertEquals(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unrelated_change(self):
+        """
+        Проверка, что изменение другого объекта на сайте не меняет ETag страниц блога и статьи
+        """
+        responses = [(url, self.client.get(url)) for url in self.urls()[1:]]
+
+        other = UserProfile.objects.create(user=get_user_model().objects.create(username="other"))
+        with self.commit_callbacks():
+            other.city = "Тула"
+            other.save()
+
+        for url, response in responses:
+            self.assertEquals(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304, url)
+
+    def test_attachment_delete(self):
+        file = File.objects.create(
+            file=DjangoFile(open(os.path.join(os.path.dirname(__file__), "me-30.jpg"), mode="rb"), "me-30.jpg"),
+            blog_article=self.blog_article
+        )
+        self.modified_test(file.delete)
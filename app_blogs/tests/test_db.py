@@ -0,0 +1,67 @@
+import os
+import tempfile
+from unittest import mock, skipUnless
+
+from django.core.signals import request_started
+from django.db import connection, connections
+from django.test import SimpleTestCase
+
+
+def create_connection(**settings):
+    settings_dict = dict(connection.settings_dict, **settings)
+    return connections["default"].__class__(settings_dict, alias="tested")
+
+
+@skipUnless(connection.vendor == "sqlite", "настройки соединения с SQLite")
+class SQLitePragmasTest(SimpleTestCase):
+    def test_pragmas(self):
+        """
+        Проверка, что у нового соединения с SQLite включены WAL и ожидание блокировки
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            tested = create_connection(NAME=os.path.join(tmp, "db.sqlite3"))
+            try:
+                with tested.cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode")
+                    self.assertEquals(cursor.fetchone()[0], "wal")
+                    cursor.execute("PRAGMA busy_timeout")
+                    self.assertEquals(cursor.fetchone()[0], 20000)
+                    cursor.execute("PRAGMA synchronous")
+                    self.assertEquals(cursor.fetchone()[0], 1)
+            finally:
+                tested.close()
+
+
+@skipUnless(connection.vendor == "sqlite", "соединение создается с временной базой SQLite")
+class HealthCheckTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_name = os.path.join(tmp.name, "db.sqlite3")
+
+    def send_request_started(self, tested):
+        with mock.patch("app_blogs.db.connections.all", return_value=[tested]):
+            request_started.send(sender=self.__class__)
+
+    def test_closes_broken_connection(self):
+        """
+        Проверка, что неработающее постоянное соединение закрывается в начале запроса
+        """
+        tested = create_connection(NAME=self.db_name, CONN_MAX_AGE=60)
+        tested.ensure_connection()
+
+        with mock.patch.object(tested, "is_usable", return_value=False):
+            self.send_request_started(tested)
+        self.assertIsNone(tested.connection)
+
+    def test_keeps_working_connection(self):
+        """
+        Проверка, что работающее соединение остается открытым
+        """
+        tested = create_connection(NAME=self.db_name, CONN_MAX_AGE=60)
+        tested.ensure_connection()
+        try:
+            self.send_request_started(tested)
+            self.assertIsNotNone(tested.connection)
+        finally:
+            tested.close()
@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+
+from app_auth.models import UserProfile
+
+from ..models import Blog, BlogArticle
+
+from .utils import TestCaseMixin
+
+
+class FeedTest(TestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.blog = Blog.objects.create(title="Blog", profile=cls.profile)
+        cls.other_blog = Blog.objects.create(title="Other blog", profile=cls.profile)
+        cls.other_profile = UserProfile.objects.create(user=get_user_model().objects.create(username="other"))
+        cls.other_profile_blog = Blog.objects.create(title="Other profile blog", profile=cls.other_profile)
+
+        cls.article = BlogArticle.objects.create(title="Article", content="Article content", blog=cls.blog)
+        cls.other_article = BlogArticle.objects.create(title="Other article", content="Content", blog=cls.other_blog)
+        cls.other_profile_article = BlogArticle.objects.create(
+            title="Other profile article", content="Content", blog=cls.other_profile_blog
+        )
+
+    def feed_urls(self):
+        username = self.profile.user.username
+        return (
+            reverse("feed_rss"), reverse("feed_atom"),
+            reverse("user_profile_feed_rss", args=(username,)), reverse("user_profile_feed_atom", args=(username,)),
+            reverse("blog_feed_rss", args=(username, self.blog.id)),
+            reverse("blog_feed_atom", args=(username, self.blog.id)),
+        )
+
+    def test_feeds(self):
+        """
+        Проверка, что ленты выводят статьи сайта, пользователя и блога
+        """
+        username = self.profile.user.username
+        response = self.client.get(reverse("feed_rss"))
+        self.assertEquals(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("application/rss+xml"))
+        for article in (self.article, self.other_article, self.other_profile_article):
+            self.assertContains(response, article.title)
+        self.assertContains(response, reverse("blog_article", args=(username, self.blog.id, self.article.id)))
+
+        response = self.client.get(reverse("user_profile_feed_atom", args=(username,)))
+        self.assertTrue(response["Content-Type"].startswith("application/atom+xml"))
+        self.assertContains(response, self.other_article.title)
+        self.assertNotContains(response, self.other_profile_article.title)
+
+        response = self.client.get(reverse("blog_feed_rss", args=(username, self.blog.id)))
+        self.assertContains(response, self.article.title)
+        self.assertNotContains(response, self.other_article.title)
+
+        response = self.client.get(reverse("blog_feed_rss", args=("other", self.blog.id)))
+        self.assertEquals(response.status_code, 404)
+
+    @override_settings(FEED_ARTICLES_COUNT=2)
+    def test_latest_articles(self):
+        """
+        Проверка, что в ленту попадают только последние статьи, а текст статей не загружается
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("feed_rss"))
+        self.assertNotContains(response, ">Article<")
+        self.assertContains(response, self.other_profile_article.title)
+
+    def test_conditional_get(self):
+        """
+        Проверка, что повторный запрос ленты отдается из кэша, а клиент с ETag или датой получает 304
+        """
+        for url in self.feed_urls():
+            response = self.client.get(url)
+            with self.assertNumQueries(0):
+                self.assertEquals(self.client.get(url).content, response.content)
+                self.assertEquals(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+                response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+                self.assertEquals(response.status_code, 304)
+
+    def test_invalidate_on_save(self):
+        """
+        Проверка, что лента собирается заново после изменения и удаления статьи
+        """
+        url = reverse("feed_rss")
+        etag = self.client.get(url)["ETag"]
+
+        self.article.title = "Changed title"
+        with self.commit_callbacks():
+            self.article.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Changed title")
+
+        with self.commit_callbacks():
+            self.article.delete()
+        self.assertNotContains(self.client.get(url), "Changed title")
+
+    def test_page_links(self):
+        """
+        Проверка, что страницы ссылаются на свои ленты
+        """
+        username = self.profile.user.username
+        response = self.client.get(reverse("blog", args=(username, self.blog.id)))
+        self.assertContains(response, reverse("blog_feed_rss", args=(username, self.blog.id)))
+        self.assertContains(response, reverse("feed_atom"))
+
+        response = self.client.get(reverse("user_profile", args=(username,)))
+        self.assertContains(response, reverse("user_profile_feed_atom", args=(username,)))
@@ -0,0 +1,71 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+
+from ..models import BlogArticle
+
+from .utils import BlogPagesTestMixin
+
+
+class FragmentCacheTest(BlogPagesTestMixin):
+    def test_fragments_reused(self):
+        """
+        Проверка, что статьи выводятся из кэша фрагментов, пока не изменилась дата изменения статьи
+        """
+        self.login_test()
+        for url in self.urls():
+            self.client.get(url)
+
+        BlogArticle.objects.filter(id=self.blog_article.id).update(content="Changed content", excerpt="Changed content")
+        for url in self.urls():
+            self.assertContains(self.client.get(url), "Article content")
+
+    def test_invalidate_on_save(self):
+        """
+        Проверка, что после изменения статьи или блога выводится новый вариант
+        """
+        self.login_test()
+        for url in self.urls():
+            self.client.get(url)
+
+        self.blog_article.content = "Changed content"
+        self.blog_article.save()
+        for url in self.urls():
+            self.assertContains(self.client.get(url), "Changed content")
+
+        self.blog.title = "Changed blog"
+        self.blog.save()
+        self.assertContains(self.client.get(reverse("home")), "Changed blog")
+
+    def test_invalidate_on_backfill(self):
+        """
+        Проверка, что после заполнения начала записи через update() выводится новый вариант,
+        а дата изменения статьи остается прежней
+        """
+        BlogArticle.objects.filter(id=self.blog_article.id).update(excerpt="")
+        edit_at = BlogArticle.objects.get(id=self.blog_article.id).edit_at
+        self.login_test()
+        for url in self.urls():
+            self.client.get(url)
+
+        BlogArticle.objects.filter(id=self.blog_article.id).update(content="Changed content")
+        call_command("backfill_excerpts", stdout=StringIO())
+        for url in self.urls():
+            self.assertContains(self.client.get(url), "Changed content")
+        self.assertEquals(BlogArticle.objects.get(id=self.blog_article.id).edit_at, edit_at)
+
+    def test_edit_links_not_cached(self):
+        """
+        Проверка, что ссылки редактирования не попадают в кэш вместе со статьей
+        """
+        edit_url = reverse("edit_blog_article", args=(self.profile.user.username, self.blog.id, self.blog_article.id))
+        blog_url = reverse("blog", args=(self.profile.user.username, self.blog.id))
+
+        self.login_test()
+        self.assertContains(self.client.get(blog_url), edit_url)
+
+        user = get_user_model().objects.create(username="reader")
+        self.client.force_login(user)
+        self.assertNotContains(self.client.get(blog_url), edit_url)
@@ -1,12 +1,101 @@
-from django.test import TestCase
+from django.test import override_settings
 from django.urls import reverse
 
+from ..cache import get_page_cache
+from ..models import Blog, BlogArticle
 
-class HomePageTest(TestCase):
+from .utils import TestCaseMixin
+
+
+class HomePageTest(TestCaseMixin):
     tested_template = "all-blog-articles.html"
     tested_url_name = "home"
 
     def test_page(self):
         response = self.client.get(reverse(self.tested_url_name))
         self.assertEquals(response.status_code, 200)
-        self.assertTemplateUsed(response, self.tested_template)
\ No newline at end of file
+        self.assertTemplateUsed(response, self.tested_template)
+
+
+@override_settings(BLOG_ARTICLES_PAGINATE_BY=3)
+class HomePagePaginationTest(TestCaseMixin):
+    tested_template = "all-blog-articles.html"
+    tested_url_name = "home"
+
+    articles_context_name = "blog_articles"
+    count = 7
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        blog = Blog.objects.create(title="Blog", profile=cls.profile)
+        for i in range(cls.count):
+            BlogArticle.objects.create(title=f"Article {i}", content=f"Article {i} content", blog=blog)
+
+        # у половины статей одинаковая дата создания, порядок между ними определяет id
+        created_at = BlogArticle.objects.latest("id").created_at
+        BlogArticle.objects.filter(id__in=BlogArticle.objects.order_by("id").values("id")[:cls.count // 2]) \
+            .update(created_at=created_at)
+
+        cls.ordered_ids = list(BlogArticle.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+
+    def page_test(self, **params):
+        response = self.client.get(reverse(self.tested_url_name), params)
+        self.assertEquals(response.status_code, 200)
+        self.assertTemplateUsed(response, self.tested_template)
+        return response
+
+    def ids(self, response):
+        return [article.id for article in response.context[self.articles_context_name]]
+
+    def test_first_page(self):
+        """
+        Проверка, что первая страница содержит самые новые статьи и нет ссылки на более новые
+        """
+        response = self.page_test()
+        page = response.context["page_obj"]
+
+        self.assertEquals(self.ids(response), self.ordered_ids[:3])
+        self.assertFalse(page.has_newer)
+        self.assertTrue(page.has_older)
+
+    def test_walk_older_and_newer(self):
+        """
+        Проверка, что переходя по курсорам можно пройти всю ленту без пропусков и повторов в обе стороны
+        """
+        seen = []
+        pages = []
+        response = self.page_test()
+        while True:
+            pages.append(self.ids(response))
+            seen.extend(pages[-1])
+            page = response.context["page_obj"]
+            if not page.has_older:
+                break
+            response = self.page_test(older=page.older_cursor)
+
+        self.assertEquals(seen, self.ordered_ids)
+
+        for expected in reversed(pages[:-1]):
+            response = self.page_test(newer=response.context["page_obj"].newer_cursor)
+            self.assertEquals(self.ids(response), expected)
+        self.assertFalse(response.context["page_obj"].has_newer)
+
+    def test_invalid_cursor(self):
+        """
+        Проверка, что на неверный курсор отвечаем 404
+        """
+        response = self.client.get(reverse(self.tested_url_name), {"older": "not-a-cursor"})
+        self.assertEquals(response.status_code, 404)
+
+    def test_queries_count(self):
+        """
+        Проверка, что количество запросов не зависит от размера страницы: блог и автор статей
+        подтягиваются в том же запросе, что и сами статьи
+        """
+        for per_page in (1, 3, self.count):
+            get_page_cache().clear()
+            with self.settings(BLOG_ARTICLES_PAGINATE_BY=per_page), self.assertNumQueries(1):
+                response = self.page_test()
+            self.assertEquals(len(response.context[self.articles_context_name]), per_page)
@@ -0,0 +1,72 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Blog, BlogArticle
+from ..pagination import KeysetPaginator
+
+from .utils import TestCaseMixin
+
+
+@skipUnless(connection.vendor == "sqlite", "проверяется по EXPLAIN QUERY PLAN из SQLite")
+class IndexesTest(TestCaseMixin):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.blog = Blog.objects.create(title="Blog", profile=cls.profile)
+        for i in range(5):
+            BlogArticle.objects.create(title=f"Article {i}", content="Content", blog=cls.blog)
+
+    def query_plan(self, func):
+        """
+        План запроса, который выполняет func
+        """
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        self.assertEquals(len(queries), 1)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {queries[0]['sql']}")
+            return "\n".join(row[-1] for row in cursor.fetchall())
+
+    def assertUsesIndex(self, func, index):
+        plan = self.query_plan(func)
+        self.assertIn(f"INDEX {index}", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_feed(self):
+        """
+        Проверка, что лента статей на главной читается по индексу без сортировки во временном дереве
+        """
+        paginator = KeysetPaginator(BlogArticle.objects.listing(), 2)
+        self.assertUsesIndex(lambda: paginator.page(), "article_created_idx")
+
+        cursor = paginator.encode_cursor(BlogArticle.objects.latest("id"))
+        self.assertUsesIndex(lambda: paginator.page(older=cursor), "article_created_idx")
+        self.assertUsesIndex(lambda: paginator.page(newer=cursor), "article_created_idx")
+
+    def test_blog_page(self):
+        """
+        Проверка, что статьи блога выбираются и сортируются по индексу
+        """
+        queryset = BlogArticle.objects.listing().filter(blog=self.blog).order_by("-created_at", "-id")
+        self.assertUsesIndex(lambda: list(queryset), "article_blog_created_idx")
+
+    def test_profile_blogs(self):
+        """
+        Проверка, что блоги на странице профиля выбираются и сортируются по индексу
+        """
+        paginator = KeysetPaginator(Blog.objects.filter(profile=self.profile), 20)
+        self.assertUsesIndex(lambda: paginator.page(), "blog_profile_created_idx")
+
+    def test_last_modified(self):
+        """
+        Проверка, что дата последнего изменения статей блога для условных запросов берется из индекса
+        """
+        self.assertUsesIndex(
+            lambda: BlogArticle.objects.filter(blog=self.blog).aggregate(last=Max("edit_at")),
+            "article_blog_edit_at_idx"
+        )
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from app_auth.models import Avatar
+
+from ..models import Blog, BlogArticle, File, PendingMediaDeletion
+
+from .utils import TestCaseMixin
+
+
+class CollectOrphanedMediaTest(TestCaseMixin):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_settings = self.settings(MEDIA_ROOT=media_root.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+    def save(self, name, content=b"data"):
+        return default_storage.save(name, ContentFile(content))
+
+    def collect(self, *args):
+        stdout = StringIO()
+        call_command("collect_orphaned_media", "--min-age=0", "--batch-size=2", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_orphans_removed(self):
+        """
+        Проверка, что удаляются только файлы без ссылок из базы, а размер освобожденного места выводится
+        """
+        blog = Blog.objects.create(title="Blog", profile=self.profile)
+        article = BlogArticle.objects.create(title="Article", content="Content", blog=blog)
+        kept = [
+            File.objects.create(file=self.save("files/file.jpg"), thumbnail=self.save("thumbnails/file.jpg"),
+                                blog_article=article).file.name,
+            Avatar.objects.create(avatar=self.save("files/avatar.jpg"), profile=self.profile).avatar.name,
+            PendingMediaDeletion.objects.create(name=self.save("files/pending.jpg")).name,
+            self.save("other/unknown.txt"),
+        ]
+        orphans = [self.save("files/old-avatar.jpg", b"12345"), self.save("thumbnails/old.jpg", b"123"),
+                   self.save("imports/articles.csv", b"1")]
+
+        self.assertIn("Будет удалено файлов: 3 (9 байт)", self.collect("--dry-run"))
+        for name in orphans:
+            self.assertTrue(default_storage.exists(name), name)
+
+        self.assertIn("Удалено файлов: 3 (9 байт)", self.collect())
+        for name in orphans:
+            self.assertFalse(default_storage.exists(name), name)
+        for name in kept:
+            self.assertTrue(default_storage.exists(name), name)
+
+    def test_recent_files_kept(self):
+        """
+        Проверка, что недавно загруженные файлы не удаляются, пока не станут старше --min-age
+        """
+        name = self.save("files/uploading.jpg")
+        stdout = StringIO()
+        call_command("collect_orphaned_media", "--min-age=3600", stdout=stdout)
+        self.assertIn("Удалено файлов: 0", stdout.getvalue())
+        self.assertTrue(default_storage.exists(name))
+
+        os.utime(default_storage.path(name), (0, 0))
+        call_command("collect_orphaned_media", "--min-age=3600", stdout=stdout)
+        self.assertFalse(default_storage.exists(name))
@@ -0,0 +1,140 @@
+import os
+import shutil
+import tempfile
+
+from django.core.files import File as DjangoFile
+from django.test import override_settings
+from django.urls import reverse
+
+from app_auth.models import Avatar
+
+from ..models import Blog, File
+
+from .utils import BlogPagesTestMixin
+
+
+class LocMemPageCacheTest(BlogPagesTestMixin):
+    def urls(self):
+        return super().urls() + (reverse("user_profile", args=(self.profile.user.username,)),)
+
+    def test_cached(self):
+        """
+        Проверка, что повторный запрос анонимного пользователя отдается из кэша без запросов к базе
+        """
+        for url in self.urls():
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+
+            self.assertEquals(second.status_code, 200)
+            self.assertIsNone(second.context)
+            self.assertEquals(first.content.split(b"csrfmiddlewaretoken")[0],
+                              second.content.split(b"csrfmiddlewaretoken")[0])
+
+    def test_csrf_token(self):
+        """
+        Проверка, что в закэшированной странице подставляется CSRF-токен текущего посетителя
+        """
+        url = reverse("home")
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertNotIn(b"__csrf_token__", response.content)
+        self.assertIn("csrftoken", response.cookies)
+
+    def test_language(self):
+        """
+        Проверка, что страница кэшируется отдельно для каждого языка
+        """
+        url = reverse("home")
+        self.client.get(url, HTTP_ACCEPT_LANGUAGE="ru")
+        response = self.client.get(url, HTTP_ACCEPT_LANGUAGE="en")
+
+        self.assertIsNotNone(response.context)
+        self.assertEquals(response.context["LANGUAGE_CODE"], "en")
+
+    def test_authenticated_bypass(self):
+        """
+        Проверка, что авторизованным пользователям страницы не отдаются из кэша
+        """
+        url = reverse("blog", args=(self.profile.user.username, self.blog.id))
+        self.client.get(url)
+
+        self.login_test()
+        response = self.client.get(url)
+        self.assertIsNotNone(response.context)
+        self.has_access_in_html_test(
+            response,
+            r'<a href="{url}">Редактировать</a>'.format(url=reverse("edit_blog", args=(self.profile.user.username, self.blog.id)))
+        )
+
+    def invalidation_test(self, change):
+        for url in self.urls():
+            self.client.get(url)
+
+        with self.commit_callbacks():
+            change()
+
+        for url in self.urls():
+            self.assertIsNotNone(self.client.get(url).context, url)
+
+    def test_invalidate_on_article_save(self):
+        def change():
+            self.blog_article.title = "New title"
+            self.blog_article.save()
+
+        self.invalidation_test(change)
+        self.assertContains(self.client.get(reverse("home")), "New title")
+
+    def test_invalidate_on_blog_delete(self):
+        self.invalidation_test(lambda: Blog.objects.create(title="Other", profile=self.profile).delete())
+
+    def test_invalidate_on_file_and_avatar(self):
+        image = os.path.join(os.path.dirname(__file__), "me-30.jpg")
+
+        self.invalidation_test(lambda: File.objects.create(
+            file=DjangoFile(open(image, mode="rb"), "me-30.jpg"), blog_article=self.blog_article
+        ))
+        self.invalidation_test(lambda: Avatar.objects.create(
+            avatar=DjangoFile(open(image, mode="rb"), "me-30.jpg"), profile=self.profile
+        ))
+
+    def test_invalidate_after_commit(self):
+        """
+        Проверка, что кэш сбрасывается только после фиксации транзакции с изменением
+        """
+        url = reverse("home")
+        self.client.get(url)
+
+        self.blog_article.title = "New title"
+        self.blog_article.save()
+        self.assertIsNone(self.client.get(url).context)
+
+    def test_login_does_not_invalidate(self):
+        """
+        Проверка, что вход пользователя (сохранение last_login) не сбрасывает кэш
+        """
+        url = reverse("home")
+        self.client.get(url)
+
+        self.login_test()
+        self.client.logout()
+
+        self.assertIsNone(self.client.get(url).context)
+
+
+class FileBasedPageCacheTest(LocMemPageCacheTest):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+
+        settings_override = override_settings(CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": self.cache_dir,
+            }
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        super().setUp()
@@ -0,0 +1,162 @@
+import os
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+
+from ..importing import import_rows
+from ..models import Blog, BlogArticle
+from ..search import SearchResults, create_search_index, rebuild_search_index
+
+from .utils import TestCaseMixin
+
+
+class SearchTest(TestCaseMixin):
+    tested_template = "search.html"
+    tested_url_name = "search"
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.blog = Blog.objects.create(title="Путешествия", description="Заметки о поездках", profile=cls.profile)
+        cls.mountains = BlogArticle.objects.create(
+            title="Горы Кавказа", content="Поход по горам. " * 20 + "Эльбрус виден издалека.", blog=cls.blog
+        )
+        cls.sea = BlogArticle.objects.create(
+            title="Море", content="Отдых на море, горы на горизонте.", blog=cls.blog
+        )
+
+    def search(self, query):
+        return [result.article.id for result in SearchResults(query)[0:20]]
+
+    def test_page(self):
+        """
+        Проверка, что страница находится по нужному адресу и использует правильный шаблон
+        """
+        response = self.client.get(reverse(self.tested_url_name), {"q": "горы"})
+        self.assertEquals(response.status_code, 200)
+        self.assertTemplateUsed(response, self.tested_template)
+        return response
+
+    def test_ranking(self):
+        """
+        Проверка, что находятся статьи по заголовку и тексту, а совпадение в заголовке ставится выше
+        """
+        self.assertEquals(self.search("горы"), [self.mountains.id, self.sea.id])
+        self.assertEquals(self.search("эльбрус"), [self.mountains.id])
+        self.assertEquals(self.search("море отдых"), [self.sea.id])
+        self.assertEquals(self.search("пустыня"), [])
+
+    def test_blog_fields(self):
+        """
+        Проверка, что статьи находятся по названию и описанию блога, в том числе после их изменения
+        """
+        self.assertEquals(len(self.search("путешествия")), 2)
+
+        self.blog.title = "Походы"
+        self.blog.save()
+
+        self.assertEquals(self.search("путешествия"), [])
+        self.assertEquals(len(self.search("походы")), 2)
+
+    def test_index_updates(self):
+        """
+        Проверка, что индекс обновляется при изменении и удалении статьи
+        """
+        article = BlogArticle.objects.create(title="Озеро", content="Байкал", blog=self.blog)
+        self.assertEquals(self.search("байкал"), [article.id])
+
+        article.content = "Ладога"
+        article.save()
+        self.assertEquals(self.search("байкал"), [])
+        self.assertEquals(self.search("ладога"), [article.id])
+
+        article.delete()
+        self.assertEquals(self.search("ладога"), [])
+
+    def test_imported_articles(self):
+        """
+        Проверка, что статьи из CSV попадают в индекс
+        """
+        import_rows(self.blog, [(1, ["Тайга", "Сибирский лес"], None), (2, ["Тундра", "Север"], None)])
+        self.assertEquals(len(self.search("сибирский")), 1)
+        self.assertEquals(len(self.search("тундра")), 1)
+
+    def test_query_sanitized(self):
+        """
+        Проверка, что синтаксис полнотекстового запроса из ввода пользователя не интерпретируется
+        """
+        for query in ('"горы', "горы OR NOT", "горы*)(:", "NEAR(", "'; DROP TABLE", "", "***"):
+            response = self.client.get(reverse(self.tested_url_name), {"q": query})
+            self.assertEquals(response.status_code, 200, query)
+
+    def test_snippet_escaped(self):
+        """
+        Проверка, что найденные слова выделяются, а текст статьи экранируется
+        """
+        BlogArticle.objects.create(title="<b>Лес</b>", content="<script>alert(1)</script> лес", blog=self.blog)
+
+        response = self.client.get(reverse(self.tested_url_name), {"q": "лес"})
+        self.assertContains(response, "&lt;b&gt;<mark>Лес</mark>&lt;/b&gt;")
+        self.assertContains(response, "&lt;script&gt;")
+        self.assertNotContains(response, "<script>")
+
+    @override_settings(SEARCH_PAGINATE_BY=1)
+    def test_pagination(self):
+        """
+        Проверка, что результаты выводятся постранично
+        """
+        response = self.test_page()
+        self.assertEquals(response.context["paginator"].count, 2)
+        self.assertEquals([r.article.id for r in response.context["results"]], [self.mountains.id])
+
+        response = self.client.get(reverse(self.tested_url_name), {"q": "горы", "page": 2})
+        self.assertEquals([r.article.id for r in response.context["results"]], [self.sea.id])
+
+        response = self.client.get(reverse(self.tested_url_name), {"q": "горы", "page": 3})
+        self.assertEquals(response.status_code, 404)
+
+    def test_rebuild(self):
+        """
+        Проверка, что индекс можно построить заново
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM app_blogs_search")
+        self.assertEquals(self.search("горы"), [])
+
+        call_command("rebuild_search_index", stdout=open(os.devnull, "w"))
+        self.assertEquals(self.search("горы"), [self.mountains.id, self.sea.id])
+
+        rebuild_search_index()
+        self.assertEquals(len(self.search("горы")), 2)
+
+    def test_setup_fills_empty_index(self):
+        """
+        Проверка, что после миграций пустой индекс заполняется существующими статьями
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM app_blogs_search")
+
+        create_search_index()
+        self.assertEquals(self.search("горы"), [self.mountains.id, self.sea.id])
+
+    def test_setup_after_flush(self):
+        """
+        Проверка, что после очистки таблиц (flush) индекс тоже очищается
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {BlogArticle._meta.db_table}")
+
+        create_search_index()
+        self.assertEquals(SearchResults("горы").count(), 0)
+
+    def test_setup_without_tables(self):
+        """
+        Проверка, что до создания таблиц блогов (migrate другого приложения) индекс не трогается
+        """
+        with mock.patch.object(connection.introspection, "table_names", return_value=[]), \
+                self.assertNumQueries(0):
+            create_search_index()
@@ -1,5 +1,12 @@
+from contextlib import contextmanager
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+
+from app_blogs.cache import get_page_cache
+from app_blogs.models import Blog, BlogArticle
 
 from app_auth.models import UserProfile
 
@@ -21,6 +28,20 @@ class TestCaseMixin(TestCase):
         cls.profile.user.set_password(cls.user_raw_password)
         cls.profile.user.save()
 
+    def setUp(self):
+        super().setUp()
+        get_page_cache().clear()
+
+    @contextmanager
+    def commit_callbacks(self):
+        """
+        TestCase не фиксирует транзакции, поэтому функции, отложенные внутри блока через on_commit, вызываются явно
+        """
+        start = len(connection.run_on_commit)
+        yield
+        for _, callback in connection.run_on_commit[start:]:
+            callback()
+
     def login_test(self):
         """
         Авторизация
@@ -34,3 +55,23 @@ class TestCaseMixin(TestCase):
     def has_access_in_html_test(self, response, url):
         self.assertContains(response, url, html=True)
 
+
+class BlogPagesTestMixin(TestCaseMixin):
+    """
+    Блог с одной статьей и адреса страниц, на которых статья выводится
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.blog = Blog.objects.create(title="Blog", profile=cls.profile)
+        cls.blog_article = BlogArticle.objects.create(title="Article", content="Article content", blog=cls.blog)
+
+    def urls(self):
+        username = self.profile.user.username
+        return (
+            reverse("home"),
+            reverse("blog", args=(username, self.blog.id)),
+            reverse("blog_article", args=(username, self.blog.id, self.blog_article.id)),
+        )
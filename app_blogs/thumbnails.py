@@ -0,0 +1,55 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+def render_thumbnail(source, image_format=None):
+    """
+    Уменьшает изображение до THUMBNAIL_SIZE. Без явного формата изображения с прозрачностью
+    сохраняются в PNG, остальные в JPEG. Возвращает содержимое и расширение файла
+    """
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(settings.THUMBNAIL_SIZE, Image.LANCZOS)
+
+        if image_format is None:
+            has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+            image_format = "PNG" if has_alpha else "JPEG"
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        buffer = BytesIO()
+        image.save(buffer, format=image_format, quality=settings.THUMBNAIL_QUALITY)
+        return buffer.getvalue(), image_format.lower().replace("jpeg", "jpg")
+
+
+def generate_thumbnails(instance, source_field, save=True):
+    """
+    Создает для файла из поля source_field миниатюру (поле thumbnail) и ее вариант в WebP (поле thumbnail_webp).
+    Если файл не является изображением, миниатюры не создаются и возвращается False
+    """
+    source = getattr(instance, source_field)
+    name = os.path.splitext(os.path.basename(source.name))[0]
+
+    try:
+        source.open("rb")
+        try:
+            thumbnail = render_thumbnail(source)
+            source.seek(0)
+            webp = render_thumbnail(source, "WEBP") if settings.THUMBNAIL_WEBP else None
+        finally:
+            source.close()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return False
+
+    for field, rendered in (("thumbnail", thumbnail), ("thumbnail_webp", webp)):
+        if rendered is not None:
+            content, extension = rendered
+            getattr(instance, field).save(f"{name}.{extension}", ContentFile(content), save=False)
+
+    if save:
+        instance.save(update_fields=["thumbnail", "thumbnail_webp"])
+    return True
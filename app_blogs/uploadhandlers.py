@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.template.defaultfilters import filesizeformat
+from django.utils.translation import gettext as _
+
+
+SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_content_type(data):
+    """
+    Определяет тип файла по первым байтам, не доверяя типу, который прислал браузер
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in SIGNATURES:
+        if data.startswith(signature):
+            return content_type
+    return None
+
+
+class LimitedUploadHandler(FileUploadHandler):
+    """
+    Проверяет файлы из полей field_names по мере чтения запроса: тип по первым байтам, размер файла,
+    общий размер и количество файлов. Неподходящий файл пропускается сразу, не дожидаясь конца загрузки,
+    и не доходит до следующих обработчиков. Ошибки собираются в errors в виде пар (поле, сообщение)
+    """
+
+    def __init__(self, request=None, field_names=()):
+        super().__init__(request)
+        self.field_names = set(field_names)
+        self.errors = []
+        self.files_count = 0
+        self.total_size = 0
+        self.file_size = 0
+        self.limited = False
+
+    def reject(self, message):
+        error = (self.field_name, message)
+        if error not in self.errors:
+            self.errors.append(error)
+        raise SkipFile()
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.limited = field_name in self.field_names
+        self.file_size = 0
+
+        if self.limited:
+            self.files_count += 1
+            if self.files_count > settings.UPLOAD_MAX_FILES:
+                self.reject(_("Можно загрузить не больше %(count)d файлов") % {"count": settings.UPLOAD_MAX_FILES})
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.limited:
+            return raw_data
+
+        if start == 0 and sniff_content_type(raw_data) not in settings.UPLOAD_ALLOWED_TYPES:
+            self.reject(_("Недопустимый тип файла %(name)s") % {"name": self.file_name})
+
+        self.file_size += len(raw_data)
+        self.total_size += len(raw_data)
+        if self.file_size > settings.UPLOAD_MAX_FILE_SIZE:
+            self.reject(_("Файл %(name)s больше %(size)s") % {
+                "name": self.file_name, "size": filesizeformat(settings.UPLOAD_MAX_FILE_SIZE)
+            })
+        if self.total_size > settings.UPLOAD_MAX_REQUEST_SIZE:
+            self.reject(_("Общий размер файлов больше %(size)s") % {
+                "size": filesizeformat(settings.UPLOAD_MAX_REQUEST_SIZE)
+            })
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
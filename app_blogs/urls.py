@@ -1,16 +1,39 @@
 from django.urls import path
 
+from .api import ArticlesApiView, UserProfileApiView, UserProfileBlogsApiView, BlogApiView, BlogArticlesApiView, \
+    BlogArticleApiView, BlogArticleFilesApiView
+from .feeds import LatestArticlesFeed, LatestArticlesAtomFeed, UserProfileArticlesFeed, UserProfileArticlesAtomFeed, \
+    BlogArticlesFeed, BlogArticlesAtomFeed
 from .views import AllBlogArticlesView, BlogView, BlogArticleView, CreateBlogView, CreateBlogArticleView, \
-    EditBlogView, EditBlogArticleView, \
+    EditBlogView, EditBlogArticleView, BlogImportsView, SearchView, ExportBlogArticlesView, ExportUserArticlesView, \
     delete_blog, delete_blog_article
 
 
 urlpatterns = [
     path("", AllBlogArticlesView.as_view(), name="home"),
+    path("search/", SearchView.as_view(), name="search"),
+    path("feed/rss/", LatestArticlesFeed(), name="feed_rss"),
+    path("feed/atom/", LatestArticlesAtomFeed(), name="feed_atom"),
+    path("api/articles/", ArticlesApiView.as_view(), name="api_articles"),
+    path("api/<slug:username>/", UserProfileApiView.as_view(), name="api_user_profile"),
+    path("api/<slug:username>/blogs/", UserProfileBlogsApiView.as_view(), name="api_user_profile_blogs"),
+    path("api/<slug:username>/blog/<int:pk>/", BlogApiView.as_view(), name="api_blog"),
+    path("api/<slug:username>/blog/<int:pk>/articles/", BlogArticlesApiView.as_view(), name="api_blog_articles"),
+    path("api/<slug:username>/blog/<int:blogid>/article/<int:pk>/", BlogArticleApiView.as_view(),
+         name="api_blog_article"),
+    path("api/<slug:username>/blog/<int:blogid>/article/<int:pk>/files/", BlogArticleFilesApiView.as_view(),
+         name="api_blog_article_files"),
+    path("<slug:username>/feed/rss/", UserProfileArticlesFeed(), name="user_profile_feed_rss"),
+    path("<slug:username>/feed/atom/", UserProfileArticlesAtomFeed(), name="user_profile_feed_atom"),
+    path("<slug:username>/export/", ExportUserArticlesView.as_view(), name="export_user_articles"),
     path("<slug:username>/blog/create/", CreateBlogView.as_view(), name="create_blog"),
     path("<slug:username>/blog/<int:pk>/", BlogView.as_view(), name="blog"),
     path("<slug:username>/blog/<int:pk>/edit/", EditBlogView.as_view(), name="edit_blog"),
     path("<slug:username>/blog/<int:pk>/delete/", delete_blog, name="delete_blog"),
+    path("<slug:username>/blog/<int:pk>/feed/rss/", BlogArticlesFeed(), name="blog_feed_rss"),
+    path("<slug:username>/blog/<int:pk>/feed/atom/", BlogArticlesAtomFeed(), name="blog_feed_atom"),
+    path("<slug:username>/blog/<int:pk>/export/", ExportBlogArticlesView.as_view(), name="export_blog_articles"),
+    path("<slug:username>/blog/<int:pk>/imports/", BlogImportsView.as_view(), name="blog_imports"),
     path("<slug:username>/blog/<int:blogid>/article/create/", CreateBlogArticleView.as_view(), name="create_blog_article"),
     path("<slug:username>/blog/<int:blogid>/article/<int:pk>/", BlogArticleView.as_view(), name="blog_article"),
     path("<slug:username>/blog/<int:blogid>/article/<int:pk>/edit/", EditBlogArticleView.as_view(), name="edit_blog_article"),
@@ -1,14 +1,26 @@
-from _csv import reader
-
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseRedirect
-from django.shortcuts import render
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponseRedirect
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
-from django.views.generic import ListView, DetailView, TemplateView
+from django.utils.decorators import method_decorator
+from django.utils.translation import gettext as _
+from django.views.generic import ListView, DetailView, TemplateView, View
 
-from .models import BlogArticle, Blog, File
+from . import deletion
+from .models import BlogArticle, Blog, File, ArticlesImportJob
 from .forms import BlogForm, BlogArticleForm, UploadBlogArticlesForm
-from .access import UserAccessMixin
+from .access import UserAccessMixin, has_access
+from .exporting import EXPORT_FORMATS, export_articles
+from .jobs import enqueue_import
+from .mixins import AnonymousPageCacheMixin, CachedObjectMixin, ConditionalGetMixin, UploadLimitsMixin
+from .pagination import KeysetPaginationMixin
+from .search import SearchResults
+from .thumbnails import generate_thumbnails
 
 from app_auth.models import UserProfile
 
@@ -18,12 +30,15 @@ def save_article_attachments(request, article):
     for att in attachments:
         file = File(file=att, blog_article=article)
         file.save()
+        generate_thumbnails(file, "file")
 
 
 @login_required
 def delete_blog(request, username, pk):
     if request.method == "GET":
-        Blog.objects.filter(id=pk, profile__user__username=request.user.username).delete()
+        blog = Blog.objects.filter(id=pk, profile__user__username=request.user.username).first()
+        if blog is not None:
+            deletion.delete_blog(blog)
 
         return HttpResponseRedirect(reverse("user_profile", args=(username,)))
     return HttpResponseRedirect(reverse("blog", args=(username, pk)))
@@ -32,42 +47,78 @@ def delete_blog(request, username, pk):
 @login_required()
 def delete_blog_article(request, username, blogid, pk):
     if request.method == "GET":
-        BlogArticle.objects.filter(id=pk, blog__id=blogid, blog__profile__user__username=request.user.username).delete()
+        article = BlogArticle.objects.filter(
+            id=pk, blog__id=blogid, blog__profile__user__username=request.user.username
+        ).only("id", "blog_id").first()
+        if article is not None:
+            deletion.delete_blog_article(article)
 
         return HttpResponseRedirect(reverse("blog", args=(username, blogid)))
     return HttpResponseRedirect(reverse("blog_article", args=(username, blogid, pk)))
 
 
-class BlogDetailMixin(DetailView):
+class BlogDetailMixin(CachedObjectMixin, DetailView):
     model = Blog
+    queryset = Blog.objects.select_related("profile__user")
     context_object_name = "blog"
     slug_field = "profile__user__username"
     slug_url_kwarg = "username"
     query_pk_and_slug = True
 
 
-class BlogArticleDetailMixin(DetailView):
+class BlogArticleDetailMixin(CachedObjectMixin, DetailView):
     model = BlogArticle
+    queryset = BlogArticle.objects.select_related("blog__profile__user")
     context_object_name = "blog_article"
     slug_field = ("blog__profile__user__username", "blog__id")
     slug_url_kwarg = ("username", "blogid")
     query_pk_and_slug = True
 
 
-class AllBlogArticlesView(ListView):
+class AllBlogArticlesView(AnonymousPageCacheMixin, ConditionalGetMixin, KeysetPaginationMixin, ListView):
     template_name = "all-blog-articles.html"
     model = BlogArticle
     context_object_name = "blog_articles"
 
+    # Last-Modified не отдается: по датам изменения нельзя заметить удаление блога или статьи,
+    # а ETag меняется вместе с поколением кэша страниц при любом изменении
+    def get_paginate_by(self, queryset):
+        return settings.BLOG_ARTICLES_PAGINATE_BY
+
+    def get_queryset(self):
+        return BlogArticle.objects.listing().order_by("-created_at", "-id")
+
+
+class SearchView(AnonymousPageCacheMixin, ListView):
+    template_name = "search.html"
+    context_object_name = "results"
+    paginator_class = Paginator
+
+    def get_paginate_by(self, queryset):
+        return settings.SEARCH_PAGINATE_BY
+
+    def get_query(self):
+        return self.request.GET.get("q", "").strip()
+
     def get_queryset(self):
-        return BlogArticle.objects.order_by("-created_at").all()
+        return SearchResults(self.get_query())
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["query"] = self.get_query()
+        return context
 
-class BlogView(BlogDetailMixin):
+
+class BlogView(AnonymousPageCacheMixin, ConditionalGetMixin, BlogDetailMixin):
     template_name = "blog.html"
 
+    def get_last_modified(self):
+        blog = self.get_object()
+        articles_edit_at = BlogArticle.objects.filter(blog=blog).aggregate(last=Max("edit_at"))["last"]
+        return max(filter(None, (blog.edit_at, articles_edit_at)))
+
     def ctx_blog_articles(self):
-        return BlogArticle.objects.filter(blog=self.get_object()).order_by("-created_at").all()
+        return BlogArticle.objects.listing().filter(blog=self.get_object()).order_by("-created_at", "-id")
 
     def get(self, request, *args, **kwargs):
         response = super().get(request)
@@ -75,42 +126,87 @@ class BlogView(BlogDetailMixin):
         response.context_data["form"] = UploadBlogArticlesForm()
         return response
 
+    @method_decorator(login_required)
     def post(self, request, *args, **kwargs):
         blog = self.get_object()
+        if not has_access(request, blog):
+            raise PermissionDenied()
+
         form = UploadBlogArticlesForm(request.POST, request.FILES)
 
         if form.is_valid():
-            file_data = form.cleaned_data["file"].read()
-
-            try:
-                records = file_data.decode("utf-8").split("\n")
-            except Exception as ex:
-                records = file_data.decode("windows-1251").split("\n")
+            job = enqueue_import(blog, form.cleaned_data["file"])
+            messages.success(request, _("Файл поставлен в очередь на импорт, номер задачи: %(id)d") % {"id": job.id})
 
-            csv_reader = reader(records, delimiter=";", quotechar='"')
-            for row in csv_reader:
-                try:
-                    BlogArticle.objects.create(title=row[0], content=row[1], blog=blog)
-                except Exception as ex:
-                    pass
-
-            return HttpResponseRedirect(reverse("blog", args=(blog.profile.user.username, blog.id)))
+            return HttpResponseRedirect(reverse("blog_imports", args=(blog.profile.user.username, blog.id)))
 
         ctx = dict()
+        ctx[self.context_object_name] = blog
         ctx["blog_articles"] = self.ctx_blog_articles()
         ctx["form"] = form
         return render(request, self.template_name, ctx)
 
 
-class BlogArticleView(BlogArticleDetailMixin):
+class BlogImportsView(UserAccessMixin, BlogDetailMixin):
+    template_name = "blog-imports.html"
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        jobs = list(ArticlesImportJob.objects.filter(blog=self.object).order_by("-id")[:20])
+        response.context_data["jobs"] = jobs
+        response.context_data["has_active_jobs"] = any(job.is_active() for job in jobs)
+        return response
+
+
+class BlogArticleView(AnonymousPageCacheMixin, ConditionalGetMixin, BlogArticleDetailMixin):
     template_name = "blog-article.html"
 
+    def get_last_modified(self):
+        # на странице статьи выводятся и название блога, а вложения сдвигают дату изменения статьи
+        blog_article = self.get_object()
+        return max(blog_article.edit_at, blog_article.blog.edit_at)
+
     def get(self, request, *args, **kwargs):
         response = super().get(request, *args, **kwargs)
         response.context_data["attachments"] = File.objects.filter(blog_article=self.get_object()).all()
         return response
 
 
+class ExportArticlesMixin:
+    """
+    Выгрузка статей владельцем в формате из GET-параметра format: csv (как для импорта) или jsonl
+    """
+
+    def get_articles(self):
+        raise NotImplementedError
+
+    def get_filename(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            raise Http404()
+        return export_articles(self.get_articles(), export_format, self.get_filename())
+
+
+class ExportBlogArticlesView(ExportArticlesMixin, UserAccessMixin, BlogDetailMixin):
+    def get_articles(self):
+        return BlogArticle.objects.filter(blog=self.get_object())
+
+    def get_filename(self):
+        blog = self.get_object()
+        return f"{blog.profile.user.username}-blog-{blog.id}"
+
+
+class ExportUserArticlesView(ExportArticlesMixin, UserAccessMixin, View):
+    def get_articles(self):
+        return BlogArticle.objects.filter(blog__profile__user__username=self.kwargs["username"])
+
+    def get_filename(self):
+        return self.kwargs["username"]
+
+
 class CreateBlogView(UserAccessMixin, TemplateView):
     template_name = "create-blog.html"
 
@@ -134,8 +230,9 @@ class CreateBlogView(UserAccessMixin, TemplateView):
         return render(request, self.template_name, {"form": form, "username": username})
 
 
-class CreateBlogArticleView(UserAccessMixin, TemplateView):
+class CreateBlogArticleView(UploadLimitsMixin, UserAccessMixin, TemplateView):
     template_name = "create-blog-article.html"
+    upload_fields = ("attachments",)
 
     def get(self, request, username, blogid, *args, **kwargs):
         response = super().get(request, *args, **kwargs)
@@ -147,10 +244,10 @@ class CreateBlogArticleView(UserAccessMixin, TemplateView):
     def post(self, request, username, blogid, *args, **kwargs):
         form = BlogArticleForm(request.POST, request.FILES)
 
-        if form.is_valid():
+        if self.form_is_valid(form):
             article = form.save(commit=False)
 
-            article.blog = Blog.objects.get(id=blogid, profile__user__username=username)
+            article.blog = get_object_or_404(Blog, id=blogid, profile__user__username=username)
             article.save()
 
             save_article_attachments(request, article)
@@ -182,8 +279,9 @@ class EditBlogView(UserAccessMixin, BlogDetailMixin):
         return render(request, self.template_name, ctx)
 
 
-class EditBlogArticleView(UserAccessMixin, BlogArticleDetailMixin):
+class EditBlogArticleView(UploadLimitsMixin, UserAccessMixin, BlogArticleDetailMixin):
     template_name = "edit-blog-article.html"
+    upload_fields = ("attachments",)
 
     def get(self, request, *args, **kwargs):
         response = super().get(request, *args, **kwargs)
@@ -194,7 +292,7 @@ class EditBlogArticleView(UserAccessMixin, BlogArticleDetailMixin):
         article = self.get_object()
         form = BlogArticleForm(request.POST, request.FILES, instance=article)
 
-        if form.is_valid():
+        if self.form_is_valid(form):
             form.save()
             save_article_attachments(request, article)
 
@@ -76,13 +76,62 @@ WSGI_APPLICATION = 'blogs.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
-DATABASES = {
+# Настройки берутся из переменных окружения DB_*, по умолчанию SQLite в каталоге проекта
+
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite3")
+
+if DB_ENGINE == "postgresql":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get("DB_NAME", "blogs"),
+            'USER': os.environ.get("DB_USER", ""),
+            'PASSWORD': os.environ.get("DB_PASSWORD", ""),
+            'HOST': os.environ.get("DB_HOST", ""),
+            'PORT': os.environ.get("DB_PORT", ""),
+            'CONN_MAX_AGE': int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get("DB_NAME", os.path.join(BASE_DIR, 'db.sqlite3')),
+            'CONN_MAX_AGE': int(os.environ.get("DB_CONN_MAX_AGE", 0)),
+            'OPTIONS': {
+                'timeout': 20,
+            },
+        }
+    }
+
+# Проверять постоянное соединение в начале каждого запроса, чтобы не отдавать ошибку
+# после перезапуска сервера БД
+DB_CONN_HEALTH_CHECKS = os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1"
+
+# Выполняются при каждом новом соединении с SQLite. WAL позволяет читать во время записи,
+# а busy_timeout ждет освобождения блокировки вместо ошибки "database is locked"
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "busy_timeout": 20000,
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -20000,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+PAGE_CACHE_ALIAS = 'default'
+
+PAGE_CACHE_TIMEOUT = 5 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -134,6 +183,54 @@ STATIC_URL = '/static/'
 MEDIA_ROOT = os.path.join(BASE_DIR, "media/")
 MEDIA_URL = "/media/"
 
+UPLOAD_MAX_FILE_SIZE = 10 * 1024 * 1024
+
+UPLOAD_MAX_REQUEST_SIZE = 50 * 1024 * 1024
+
+UPLOAD_MAX_FILES = 20
+
+UPLOAD_ALLOWED_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+
+THUMBNAIL_SIZE = (200, 200)
+
+THUMBNAIL_QUALITY = 85
+
+THUMBNAIL_WEBP = True
+
 LOGIN_URL = "/login/"
 
-LOGIN_REDIRECT_URL = "/"
\ No newline at end of file
+LOGIN_REDIRECT_URL = "/"
+
+
+# Blogs
+
+BLOG_ARTICLES_PAGINATE_BY = 20
+
+PROFILE_BLOGS_PAGINATE_BY = 20
+
+# Сколько последних статей выводится в RSS и Atom лентах
+FEED_ARTICLES_COUNT = 20
+
+# Ленты сбрасываются вместе с кэшем страниц при изменении статей, поэтому их можно хранить долго
+FEED_CACHE_TIMEOUT = 60 * 60
+
+API_PAGINATE_BY = 20
+
+SEARCH_PAGINATE_BY = 20
+
+# Конфигурация полнотекстового поиска PostgreSQL (для SQLite используется FTS5)
+SEARCH_POSTGRES_CONFIG = "russian"
+
+BLOG_ARTICLES_IMPORT_BATCH_SIZE = 500
+
+# Размер пачки при удалении блогов и статей (не больше лимита параметров запроса SQLite)
+BLOG_DELETE_BATCH_SIZE = 500
+
+# Сколько статей читается из базы за раз при выгрузке
+BLOG_ARTICLES_EXPORT_CHUNK_SIZE = 500
+
+BLOG_ARTICLES_IMPORT_MAX_FIELD_SIZE = 10 * 1024 * 1024
+
+BLOG_ARTICLES_IMPORT_POLL_INTERVAL = 5
+
+BLOG_ARTICLES_IMPORT_STALE_TIMEOUT = 10 * 60
@@ -18,7 +18,7 @@ from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('', include("app_auth.urls")),
     path('', include("app_blogs.urls")),
+    path('', include("app_auth.urls")),
     path('i18n/', include("django.conf.urls.i18n")),
 ]